@@ -1,8 +1,20 @@
 from flask import Flask
+from flask.json.provider import DefaultJSONProvider
 
+import daily
+import metrics
+import practice
 from routes import bp
 
 
+class TimedJSONProvider(DefaultJSONProvider):
+    """Flask's JSON provider, with serialization timed as "json_dumps" in the metrics."""
+
+    def dumps(self, obj, **kwargs) -> str:
+        with metrics.timer("json_dumps"):
+            return super().dumps(obj, **kwargs)
+
+
 def create_app() -> Flask:
     # Serve static assets (playing card PNGs) from the local "assets" folder.
     app = Flask(
@@ -11,9 +23,18 @@ def create_app() -> Flask:
         static_url_path="/assets",
     )
 
+    # Time JSON serialization separately from the analysis in the metrics.
+    app.json = TimedJSONProvider(app)
+
     # Register main routes / API.
     app.register_blueprint(bp)
 
+    # Analyze today's and tomorrow's daily puzzles ahead of requests.
+    daily.warm_up()
+
+    # Keep a pool of analyzed practice deals topped up.
+    practice.start_filler()
+
     return app
 
 
@@ -0,0 +1,300 @@
+"""
+Benchmarks for the gameplay hot paths, with comparison against a baseline.
+
+Every benchmark runs over fixed deal corpora, so two runs on the same
+machine time exactly the same work:
+
+    - "random": deals drawn from a Random seeded with --seed
+    - "worst": hand-picked expensive deals (several fives, runs with pairs,
+      flushes, four of a kind) where scoring finds the most combinations
+
+The result cache is switched off while timing, so every call does the full
+computation. Run the suite, save the JSON, and compare a later run with it:
+
+    python bench.py run --output data/bench/baseline.json
+    python bench.py run --baseline data/bench/baseline.json
+    python bench.py compare data/bench/baseline.json data/bench/latest.json
+
+`run --baseline` and `compare` exit with status 1 if any benchmark got
+slower (mean latency) by more than --threshold.
+"""
+
+from __future__ import annotations
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import random
+import sys
+import time
+from typing import Callable, List, Sequence
+
+import numpy as np
+
+import pegging
+import score_table
+from gameplay import (
+    CARD_CODES,
+    best_keep_from_six,
+    crib_outcome_stats,
+    get_scoring_breakdown,
+    score_hand,
+    starter_outcome_stats,
+)
+
+
+# The first 4 cards of a deal are the keep, the first 5 a hand with starter,
+# the last 2 the discard.
+WORST_DEALS: List[List[str]] = [
+    ["5C", "5D", "5H", "JS", "5S", "TC"],  # 29 hand: four fives and the right jack
+    ["5C", "5D", "5H", "TS", "JC", "QD"],  # three fives with tens
+    ["3C", "3D", "4H", "4S", "5C", "5D"],  # double-double runs
+    ["4C", "5D", "5H", "6S", "6C", "5S"],  # triple runs of three
+    ["7C", "7D", "8H", "8S", "9C", "9D"],  # pairs of every rank of a run
+    ["6C", "7D", "8H", "9S", "9C", "8D"],  # run of four with pairs
+    ["AC", "2C", "3C", "4C", "5C", "6C"],  # flush runs
+    ["JH", "JD", "JC", "JS", "QH", "QD"],  # four jacks: knobs for every starter suit
+]
+DEFAULT_SIZE = 20
+DEFAULT_SEED = 0
+DEFAULT_THRESHOLD = 0.10
+CORPORA = ("random", "worst")
+
+
+def random_deals(size: int, seed: int) -> List[List[str]]:
+    """`size` random 6-card deals from a Random seeded with `seed`."""
+    rng = random.Random(seed)
+    return [rng.sample(CARD_CODES, 6) for _ in range(size)]
+
+
+def corpus(name: str, size: int = DEFAULT_SIZE, seed: int = DEFAULT_SEED) -> List[List[str]]:
+    """The deals of corpus `name` (see CORPORA)."""
+    if name == "random":
+        return random_deals(size, seed)
+    if name == "worst":
+        return [list(deal) for deal in WORST_DEALS]
+    raise ValueError(f"Unknown corpus {name!r}; expected one of {', '.join(CORPORA)}")
+
+
+def pegging_keep(deal: List[str]) -> dict:
+    """best_keep_from_six with pegging, from a cold pegging search."""
+    # Search tables are per call already; the memoized play scores are not.
+    pegging._play.cache_clear()
+    return best_keep_from_six(deal, include_crib=False, include_pegging=True)
+
+
+def benchmarks(engine: str = "rank_class") -> List[tuple[str, int, Callable[[List[str]], object]]]:
+    """
+    (name, calls per timing, fn(deal)) for every benchmark.
+
+    Fast functions are called several times per timing so the clock
+    resolution does not dominate. `engine` is passed to the stats functions.
+    """
+    return [
+        ("score_hand", 200, lambda deal: score_hand(deal[:5])),
+        ("score_hand[crib]", 200, lambda deal: score_hand(deal[:5], is_crib=True)),
+        ("get_scoring_breakdown", 50, lambda deal: get_scoring_breakdown(deal[:5])),
+        ("starter_outcome_stats", 10, lambda deal: starter_outcome_stats(deal[:4], engine=engine)),
+        ("crib_outcome_stats", 1, lambda deal: crib_outcome_stats(deal[4:], six_cards=deal, engine=engine)),
+        ("best_keep_from_six[no_crib]", 1, lambda deal: best_keep_from_six(deal, include_crib=False)),
+        ("best_keep_from_six[crib]", 1, lambda deal: best_keep_from_six(deal, include_crib=True)),
+        ("best_keep_from_six[crib,prune]", 1, lambda deal: best_keep_from_six(deal, include_crib=True, prune=True)),
+        ("best_keep_from_six[pegging]", 1, pegging_keep),
+    ]
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an ascending list."""
+    index = max(0, min(len(sorted_values) - 1, int(round(fraction * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+def time_benchmark(fn: Callable[[List[str]], object], number: int, deals: List[List[str]], repeat: int) -> dict:
+    """
+    Time fn over every deal, `repeat` passes after one warm-up pass.
+
+    Each (pass, deal) gives one latency sample: the time of `number` calls
+    divided by `number`. Returns calls, seconds, ops_per_sec and mean_ms,
+    p50_ms, p95_ms, max_ms over the samples.
+    """
+    for deal in deals:
+        fn(deal)
+
+    latencies = []
+    elapsed = 0.0
+    for _ in range(repeat):
+        for deal in deals:
+            start = time.perf_counter()
+            for _ in range(number):
+                fn(deal)
+            took = time.perf_counter() - start
+            elapsed += took
+            latencies.append(took / number)
+
+    latencies.sort()
+    calls = number * len(latencies)
+    return {
+        "calls": calls,
+        "seconds": elapsed,
+        "ops_per_sec": calls / elapsed if elapsed else 0.0,
+        "mean_ms": 1000 * sum(latencies) / len(latencies),
+        "p50_ms": 1000 * percentile(latencies, 0.50),
+        "p95_ms": 1000 * percentile(latencies, 0.95),
+        "max_ms": 1000 * latencies[-1],
+    }
+
+
+def run(
+    *,
+    size: int = DEFAULT_SIZE,
+    seed: int = DEFAULT_SEED,
+    repeat: int = 3,
+    engine: str = "rank_class",
+    only: Sequence[str] = (),
+    corpora: Sequence[str] = CORPORA,
+) -> dict:
+    """
+    Run the suite and return the JSON-ready report.
+
+    {"meta": {...}, "results": {benchmark: {corpus: timings}}}, where
+    timings are `time_benchmark`'s. `only` keeps benchmarks whose name
+    contains any of the given substrings.
+    """
+    # Time the computation itself, not cache lookups.
+    os.environ["CRIBBDLE_CACHE_SIZE"] = "0"
+    os.environ["CRIBBDLE_CACHE_PATH"] = ""
+
+    deals = {name: corpus(name, size, seed) for name in corpora}
+    results: dict[str, dict[str, dict]] = {}
+    for name, number, fn in benchmarks(engine):
+        if only and not any(part in name for part in only):
+            continue
+        results[name] = {}
+        for corpus_name, corpus_deals in deals.items():
+            timings = time_benchmark(fn, number, corpus_deals, repeat)
+            results[name][corpus_name] = timings
+            print(
+                f"{name:32} {corpus_name:7} {timings['mean_ms']:10.3f} ms  {timings['ops_per_sec']:12.1f} ops/s",
+                file=sys.stderr,
+                flush=True,
+            )
+
+    return {
+        "meta": {
+            "created": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+            "platform": platform.platform(),
+            "score_table": os.path.exists(score_table.table_path()),
+            "engine": engine,
+            "size": size,
+            "seed": seed,
+            "repeat": repeat,
+        },
+        "results": results,
+    }
+
+
+def compare(baseline: dict, current: dict, threshold: float = DEFAULT_THRESHOLD) -> tuple[List[dict], bool]:
+    """
+    Compare two reports benchmark by benchmark.
+
+    Returns one row per (benchmark, corpus) present in both, with the
+    baseline and current mean_ms and their relative change, and whether any
+    change is a slowdown of more than `threshold` (0.10 = 10%).
+    """
+    rows = []
+    regressed = False
+    for name, by_corpus in current["results"].items():
+        for corpus_name, timings in by_corpus.items():
+            old = baseline["results"].get(name, {}).get(corpus_name)
+            if old is None:
+                continue
+            change = timings["mean_ms"] / old["mean_ms"] - 1 if old["mean_ms"] else 0.0
+            slower = change > threshold
+            regressed |= slower
+            rows.append(
+                {
+                    "benchmark": name,
+                    "corpus": corpus_name,
+                    "baseline_ms": old["mean_ms"],
+                    "current_ms": timings["mean_ms"],
+                    "change": change,
+                    "regression": slower,
+                }
+            )
+    return rows, regressed
+
+
+def print_comparison(rows: List[dict]) -> None:
+    for row in rows:
+        flag = "  REGRESSION" if row["regression"] else ""
+        print(
+            f"{row['benchmark']:32} {row['corpus']:7} {row['baseline_ms']:10.3f} ms -> "
+            f"{row['current_ms']:10.3f} ms  {row['change']:+7.1%}{flag}"
+        )
+
+
+def _load(path: str) -> dict:
+    with open(path) as f:
+        return json.load(f)
+
+
+def _write(report: dict, path: str) -> None:
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+        f.write("\n")
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the gameplay hot paths.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    run_parser = sub.add_parser("run", help="run the benchmarks and print or save JSON results")
+    run_parser.add_argument("--output", default=None, help="write the JSON report here (default: stdout)")
+    run_parser.add_argument("--baseline", default=None, help="compare against this saved report")
+    run_parser.add_argument("--size", type=int, default=DEFAULT_SIZE, help="deals in the random corpus")
+    run_parser.add_argument("--seed", type=int, default=DEFAULT_SEED, help="seed of the random corpus")
+    run_parser.add_argument("--repeat", type=int, default=3, help="timed passes over each corpus")
+    run_parser.add_argument("--engine", default="rank_class", help="engine for the stats functions")
+    run_parser.add_argument("--only", action="append", default=[], help="only benchmarks containing this text")
+    run_parser.add_argument("--corpus", action="append", choices=CORPORA, help="corpora to use (default: all)")
+    run_parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="allowed slowdown")
+    compare_parser = sub.add_parser("compare", help="compare two saved reports")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="allowed slowdown")
+
+    args = parser.parse_args(argv)
+    if args.command == "run":
+        report = run(
+            size=args.size,
+            seed=args.seed,
+            repeat=args.repeat,
+            engine=args.engine,
+            only=args.only,
+            corpora=args.corpus or CORPORA,
+        )
+        if args.output:
+            _write(report, args.output)
+        elif not args.baseline:
+            print(json.dumps(report, indent=2))
+        if args.baseline:
+            rows, regressed = compare(_load(args.baseline), report, args.threshold)
+            print_comparison(rows)
+            if regressed:
+                sys.exit(1)
+    elif args.command == "compare":
+        rows, regressed = compare(_load(args.baseline), _load(args.current), args.threshold)
+        print_comparison(rows)
+        if regressed:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""
+Seeded daily puzzle: one deal per UTC day, analyzed ahead of time.
+
+The deal for a date is drawn from a Random seeded with CRIBBDLE_DAILY_SEED and
+the date, so every worker (and every rerun) agrees on it without shared
+state. Its full `best_keep_from_six` analysis, with the crib, for both
+`my_crib` settings, is written to CRIBBDLE_DAILY_DIR as <date>.json. The same
+step also fills the result cache for every keep and discard of the deal, so
+scoring requests on the daily deal are lookups.
+
+Precompute upcoming days from a scheduler (e.g. cron) with:
+
+    python daily.py precompute --days 2
+
+The app also does it for today and tomorrow at startup, and on demand for
+any day that is missing.
+"""
+
+from __future__ import annotations
+
+import argparse
+import datetime
+import json
+import os
+import random
+import threading
+from itertools import combinations
+from typing import List, Sequence
+
+from gameplay import CARD_CODES, best_keep_from_six, crib_outcome_stats, starter_outcome_stats, to_jsonable
+
+
+DEFAULT_SEED = "cribbdle"
+DEFAULT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "daily")
+
+_lock = threading.Lock()
+_loaded: dict[str, dict] = {}
+
+
+def seed() -> str:
+    """Secret mixed into every daily deal, from CRIBBDLE_DAILY_SEED."""
+    return os.environ.get("CRIBBDLE_DAILY_SEED", DEFAULT_SEED)
+
+
+def puzzle_dir() -> str:
+    """Directory of precomputed puzzles, overridable with CRIBBDLE_DAILY_DIR."""
+    return os.environ.get("CRIBBDLE_DAILY_DIR", DEFAULT_DIR)
+
+
+def today() -> datetime.date:
+    """The current puzzle date (UTC)."""
+    return datetime.datetime.now(datetime.timezone.utc).date()
+
+
+def seconds_until_next_puzzle() -> int:
+    """Seconds left before the UTC day, and so the puzzle, changes."""
+    now = datetime.datetime.now(datetime.timezone.utc)
+    tomorrow = datetime.datetime.combine(now.date() + datetime.timedelta(days=1), datetime.time(), now.tzinfo)
+    return max(1, int((tomorrow - now).total_seconds()))
+
+
+def deal_for(day: datetime.date) -> List[str]:
+    """The 6 cards dealt on `day`, in deal order."""
+    rng = random.Random(f"{seed()}:{day.isoformat()}")
+    return rng.sample(CARD_CODES, 6)
+
+
+def analyze(day: datetime.date) -> dict:
+    """
+    Compute the puzzle for `day` and warm the result cache for its deal.
+
+    Returns {"date", "cards", "analysis": {"my_crib", "opponent_crib"}}, where
+    each analysis is `best_keep_from_six(cards, include_crib=True)` as plain
+    JSON-ready dicts.
+    """
+    cards = deal_for(day)
+    analysis = {
+        "my_crib": best_keep_from_six(cards, my_crib=True, include_crib=True),
+        "opponent_crib": best_keep_from_six(cards, my_crib=False, include_crib=True),
+    }
+    # Whatever four cards a player keeps, its stats and its crib are cached.
+    for keep in combinations(cards, 4):
+        starter_outcome_stats(keep)
+        crib_outcome_stats([c for c in cards if c not in keep], six_cards=cards)
+    return {"date": day.isoformat(), "cards": cards, "analysis": to_jsonable(analysis)}
+
+
+def _path(day: datetime.date) -> str:
+    return os.path.join(puzzle_dir(), f"{day.isoformat()}.json")
+
+
+def load(day: datetime.date) -> dict | None:
+    """The stored puzzle for `day`, or None if it has not been precomputed."""
+    key = day.isoformat()
+    with _lock:
+        if key in _loaded:
+            return _loaded[key]
+    try:
+        with open(_path(day)) as f:
+            puzzle = json.load(f)
+    except FileNotFoundError:
+        return None
+    if puzzle.get("cards") != deal_for(day):
+        # Stored under a different seed.
+        return None
+    with _lock:
+        _loaded[key] = puzzle
+    return puzzle
+
+
+def precompute(day: datetime.date) -> dict:
+    """Return the puzzle for `day`, computing and storing it if needed."""
+    puzzle = load(day)
+    if puzzle is not None:
+        return puzzle
+
+    puzzle = analyze(day)
+    path = _path(day)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(puzzle, f)
+    os.replace(tmp_path, path)
+    with _lock:
+        _loaded[day.isoformat()] = puzzle
+    return puzzle
+
+
+def warm_up(days: int = 2) -> None:
+    """Precompute today's puzzle and the following ones in a background thread."""
+    start = today()
+
+    def run() -> None:
+        for offset in range(days):
+            precompute(start + datetime.timedelta(days=offset))
+
+    threading.Thread(target=run, name="cribbdle-daily", daemon=True).start()
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Manage precomputed daily puzzles.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    precompute_parser = sub.add_parser("precompute", help="analyze and store upcoming daily puzzles")
+    precompute_parser.add_argument("--start", default=None, help="first date, YYYY-MM-DD (default: today, UTC)")
+    precompute_parser.add_argument("--days", type=int, default=2, help="number of days (default: 2)")
+
+    args = parser.parse_args(argv)
+    if args.command == "precompute":
+        start = datetime.date.fromisoformat(args.start) if args.start else today()
+        for offset in range(args.days):
+            puzzle = precompute(start + datetime.timedelta(days=offset))
+            print(f"{puzzle['date']}: {' '.join(puzzle['cards'])}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+"""
+Deal sessions: speculative analysis started when a practice deal is dealt.
+
+While a player picks a keep, the deal is analyzed in the background with
+`evaluate_deal` (practice pool deals come with it done already). This
+speculative work has its own thread and queue, apart from the jobs.py
+threads, so it never delays or takes the place of work a client asked for:
+when CRIBBDLE_DEAL_SESSION_QUEUE analyses are already waiting or running, a
+new deal is simply not analyzed. /api/deal returns a deal_id, and scoring
+calls that send it back with the same six cards reuse the finished analysis
+instead of starting from scratch. An analysis still in progress is waited
+for briefly; one that has not started yet is cancelled and the caller
+computes as usual.
+
+Sessions live in each worker's memory. At most CRIBBDLE_DEAL_SESSIONS are
+kept (the oldest is dropped first) and each expires after
+CRIBBDLE_DEAL_SESSION_TTL seconds. A request that reaches another worker, or
+a session that is unknown, expired or belongs to other cards, simply falls
+back to computing on demand.
+
+Settings:
+    CRIBBDLE_DEAL_SESSIONS       sessions kept per worker (default 256, 0 = off)
+    CRIBBDLE_DEAL_SESSION_TTL    seconds a session is kept (default 900)
+    CRIBBDLE_DEAL_SESSION_QUEUE  speculative analyses waiting or running at
+                                 once per worker (default 4)
+"""
+
+from __future__ import annotations
+
+import os
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Iterable
+
+from gameplay import card_ids, evaluate_deal
+
+
+DEFAULT_SESSIONS = 256
+DEFAULT_TTL = 900
+DEFAULT_QUEUE = 4
+
+# How long a scoring call waits for an analysis already running (a cold
+# deal takes tens of milliseconds) before computing it itself.
+WAIT_SECONDS = 2.0
+
+
+class DealSession:
+    """The dealt cards and the future of their analysis (None if not started)."""
+
+    __slots__ = ("cards", "future", "expires_at")
+
+    def __init__(self, cards: tuple[int, ...], future: Future | None, expires_at: float) -> None:
+        self.cards = cards
+        self.future = future
+        self.expires_at = expires_at
+
+
+_sessions: OrderedDict[str, DealSession] = OrderedDict()
+_lock = threading.Lock()
+
+_executor: ThreadPoolExecutor | None = None
+_executor_pid: int | None = None
+# Unfinished analyses by dealt cards, shared by identical deals.
+_analyses: dict[tuple[int, ...], Future] = {}
+
+
+def max_sessions() -> int:
+    """Configured number of sessions kept per worker."""
+    return int(os.environ.get("CRIBBDLE_DEAL_SESSIONS", str(DEFAULT_SESSIONS)))
+
+
+def ttl() -> float:
+    """Configured seconds a session is kept."""
+    return float(os.environ.get("CRIBBDLE_DEAL_SESSION_TTL", str(DEFAULT_TTL)))
+
+
+def queue_size() -> int:
+    """Configured number of speculative analyses waiting or running at once."""
+    return int(os.environ.get("CRIBBDLE_DEAL_SESSION_QUEUE", str(DEFAULT_QUEUE)))
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    """This process's analysis thread. Caller holds _lock."""
+    global _executor, _executor_pid
+
+    if _executor is None or _executor_pid != os.getpid():
+        _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="cribbdle-deal")
+        _executor_pid = os.getpid()
+        _analyses.clear()
+    return _executor
+
+
+def _speculate(cards: tuple[int, ...]) -> Future | None:
+    """
+    The analysis of `cards`, started if needed, or None if the queue is
+    full. Caller holds _lock.
+    """
+    future = _analyses.get(cards)
+    if future is not None:
+        return future
+    executor = _get_executor()
+    if len(_analyses) >= queue_size():
+        return None
+    # Deliberately not run in the request's context: the analysis is not
+    # part of the request that dealt the cards.
+    future = executor.submit(evaluate_deal, cards)
+    _analyses[cards] = future
+    future.add_done_callback(lambda _: _forget(cards, future))
+    return future
+
+
+def _forget(cards: tuple[int, ...], future: Future) -> None:
+    with _lock:
+        if _analyses.get(cards) is future:
+            del _analyses[cards]
+
+
+def _expire(now: float) -> None:
+    """Drop expired sessions. Caller holds _lock."""
+    # Sessions are in creation order and share one TTL, so expired ones lead.
+    while _sessions:
+        session_id, session = next(iter(_sessions.items()))
+        if session.expires_at > now:
+            break
+        del _sessions[session_id]
+
+
+def start(six_cards: Iterable[str | int], analysis: dict | None = None) -> str | None:
+    """
+    Open a session for a deal and start analyzing it in the background.
+
+    `analysis`, if given, is the deal's `evaluate_deal` result (of the
+    sorted cards) computed already, and is used instead. Returns the deal
+    id, or None when sessions are disabled.
+    """
+    size = max_sessions()
+    if size <= 0:
+        return None
+    cards = tuple(sorted(card_ids(six_cards)))
+    session_id = secrets.token_urlsafe(12)
+    now = time.monotonic()
+    if analysis is not None:
+        future = Future()
+        future.set_result(analysis)
+    with _lock:
+        _expire(now)
+        if analysis is None:
+            future = _speculate(cards)
+        _sessions[session_id] = DealSession(cards, future, now + ttl())
+        while len(_sessions) > size:
+            _sessions.popitem(last=False)
+    return session_id
+
+
+def analysis(session_id: str | None, six_cards: Iterable[str | int]) -> dict | None:
+    """
+    The `evaluate_deal` result of a session's deal, if it is ready soon.
+
+    Returns None, for the caller to compute as usual, if the session is
+    unknown or expired or was opened for other cards, or if its analysis
+    was not started, failed, is still queued (it is then cancelled) or does
+    not finish within WAIT_SECONDS.
+    """
+    if not session_id or not isinstance(session_id, str):
+        return None
+    cards = tuple(sorted(card_ids(six_cards)))
+    with _lock:
+        _expire(time.monotonic())
+        session = _sessions.get(session_id)
+    if session is None or session.cards != cards or session.future is None:
+        return None
+    future = session.future
+    if future.cancel():
+        # Not started yet: the caller computes it now rather than waiting
+        # behind other speculative work.
+        return None
+    try:
+        return future.result(timeout=WAIT_SECONDS)
+    except Exception:
+        # Cancelled, failed or too slow.
+        return None
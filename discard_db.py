@@ -0,0 +1,312 @@
+"""
+Precomputed optimal-discard database for every 6-card deal.
+
+Deals that differ only by a relabeling of suits have the same best keep, so
+the database holds one record per suit-isomorphic class (the canonical form
+from `gameplay.canonicalize`). Each record stores, for a regular hand with
+the crib counted, the best keep and its two expected-value components (hand
+avg_total and crib avg_score) both when the crib is yours and when it is
+your opponent's.
+
+Build it with:
+
+    python discard_db.py build --workers 8
+
+The classes are split into shards by rank multiset; each finished shard is
+written to the work directory, so an interrupted build picks up where it
+stopped when rerun with the same arguments. `--limit N` only covers the
+first N rank multisets, which is enough to try the pipeline.
+
+File layout (little-endian):
+
+    MAGIC | count (uint64) | keys (count x uint64, sorted) | records
+
+A key packs the 6 canonical card ids, 6 bits each. A record is RECORD_DTYPE;
+values are float64, so answers match a computed `best_keep_from_six` exactly.
+`load()` memory-maps the file and `DiscardDB.lookup` binary-searches the keys.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import warnings
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from itertools import combinations, combinations_with_replacement, product
+from typing import Iterable, List, Sequence
+
+import numpy as np
+
+from gameplay import (
+    best_keep_from_six,
+    canonicalize,
+    card_ids,
+    inverse_permutation,
+    relabel,
+)
+
+
+MAGIC = b"CRIBDDB2"
+HEADER_SIZE = len(MAGIC) + 8
+RECORD_DTYPE = np.dtype(
+    [
+        ("my_keep", "u1"),
+        ("opponent_keep", "u1"),
+        ("my_hand_avg", "<f8"),
+        ("my_crib_avg", "<f8"),
+        ("opponent_hand_avg", "<f8"),
+        ("opponent_crib_avg", "<f8"),
+    ]
+)
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "discard_db.bin")
+DEFAULT_SHARDS = 256
+
+# Index of each 4-card keep among combinations(sorted deal, 4), by position.
+_KEEP_POSITIONS = list(combinations(range(6), 4))
+
+
+def db_path() -> str:
+    """Path of the database, overridable with CRIBBDLE_DISCARD_DB."""
+    return os.environ.get("CRIBBDLE_DISCARD_DB", DEFAULT_PATH)
+
+
+def deal_key(canonical_deal: Sequence[int]) -> int:
+    """Pack a sorted canonical deal into its 36-bit key."""
+    key = 0
+    for c in canonical_deal:
+        key = (key << 6) | c
+    return key
+
+
+def rank_multisets(limit: int | None = None) -> List[tuple[int, ...]]:
+    """Every multiset of 6 ranks with at most 4 of a rank, in order."""
+    multisets = [m for m in combinations_with_replacement(range(13), 6) if max(Counter(m).values()) <= 4]
+    return multisets[:limit] if limit is not None else multisets
+
+
+def canonical_deals(ranks: tuple[int, ...]) -> List[tuple[int, ...]]:
+    """Canonical forms of every deal with these ranks, sorted."""
+    counts = sorted(Counter(ranks).items())
+    suit_choices = [list(combinations(range(4), k)) for _, k in counts]
+    # Any suits of the lowest rank can be relabeled to the first k suits.
+    suit_choices[0] = [tuple(range(counts[0][1]))]
+    deals = set()
+    for suits in product(*suit_choices):
+        cards = [rank * 4 + suit for (rank, _), chosen in zip(counts, suits) for suit in chosen]
+        (canonical,), _ = canonicalize(cards)
+        deals.add(canonical)
+    return sorted(deals)
+
+
+def _keep_index(deal: tuple[int, ...], keep: Iterable[str]) -> int:
+    kept = set(card_ids(keep))
+    return _KEEP_POSITIONS.index(tuple(i for i, c in enumerate(deal) if c in kept))
+
+
+def analyze(deal: tuple[int, ...]) -> tuple:
+    """Record fields for one canonical deal (see RECORD_DTYPE)."""
+    mine = best_keep_from_six(deal, my_crib=True, include_crib=True, prune=True)
+    theirs = best_keep_from_six(deal, my_crib=False, include_crib=True, prune=True)
+    return (
+        _keep_index(deal, mine["best_keep"]),
+        _keep_index(deal, theirs["best_keep"]),
+        mine["best_stats"]["avg_total"],
+        mine["best_crib_stats"]["avg_score"],
+        theirs["best_stats"]["avg_total"],
+        theirs["best_crib_stats"]["avg_score"],
+    )
+
+
+def _shard_path(work_dir: str, shard: int) -> str:
+    return os.path.join(work_dir, f"shard-{shard:04d}.npz")
+
+
+def _init_worker() -> None:
+    # Builds touch every deal once, so skip the shared on-disk result cache.
+    os.environ["CRIBBDLE_CACHE_PATH"] = ""
+
+
+def build_shard(shard: int, num_shards: int, limit: int | None, work_dir: str) -> int:
+    """
+    Analyze every deal of one shard and write it to the work directory.
+
+    Returns the number of deals. A shard already on disk is left alone.
+    """
+    path = _shard_path(work_dir, shard)
+    if os.path.exists(path):
+        with np.load(path) as existing:
+            return len(existing["keys"])
+
+    keys: List[int] = []
+    records: List[tuple] = []
+    for ranks in rank_multisets(limit)[shard::num_shards]:
+        for deal in canonical_deals(ranks):
+            keys.append(deal_key(deal))
+            records.append(analyze(deal))
+
+    tmp_path = f"{path}.tmp.npz"
+    np.savez(tmp_path, keys=np.array(keys, dtype="<u8"), records=np.array(records, dtype=RECORD_DTYPE))
+    os.replace(tmp_path, path)
+    return len(keys)
+
+
+def build(
+    path: str | None = None,
+    *,
+    workers: int = 1,
+    num_shards: int = DEFAULT_SHARDS,
+    limit: int | None = None,
+    work_dir: str | None = None,
+) -> str:
+    """
+    Build the database, resuming from any shards already in `work_dir`.
+
+    Returns the path written.
+    """
+    path = path or db_path()
+    work_dir = work_dir or f"{path}.work"
+    os.makedirs(work_dir, exist_ok=True)
+
+    # Shards are only reusable by a build that splits the work the same way.
+    manifest_path = os.path.join(work_dir, "manifest.json")
+    manifest = {"num_shards": num_shards, "limit": limit}
+    if os.path.exists(manifest_path):
+        with open(manifest_path) as f:
+            if json.load(f) != manifest:
+                raise ValueError(f"{work_dir!r} holds shards of a different build; remove it or match its arguments")
+    else:
+        with open(manifest_path, "w") as f:
+            json.dump(manifest, f)
+
+    shards = range(num_shards)
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as executor:
+            futures = [executor.submit(build_shard, shard, num_shards, limit, work_dir) for shard in shards]
+            for done, future in enumerate(futures, start=1):
+                future.result()
+                print(f"shard {done}/{num_shards} done", flush=True)
+    else:
+        _init_worker()
+        for shard in shards:
+            build_shard(shard, num_shards, limit, work_dir)
+            print(f"shard {shard + 1}/{num_shards} done", flush=True)
+
+    keys = []
+    records = []
+    for shard in shards:
+        with np.load(_shard_path(work_dir, shard)) as data:
+            keys.append(data["keys"])
+            records.append(data["records"])
+    all_keys = np.concatenate(keys)
+    all_records = np.concatenate(records)
+    order = np.argsort(all_keys, kind="stable")
+
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(MAGIC)
+        f.write(np.uint64(len(all_keys)).tobytes())
+        f.write(all_keys[order].astype("<u8").tobytes())
+        f.write(all_records[order].tobytes())
+    os.replace(tmp_path, path)
+    return path
+
+
+class DiscardDB:
+    """A loaded database; look deals up with `lookup`."""
+
+    def __init__(self, keys: np.ndarray, records: np.ndarray) -> None:
+        self.keys = keys
+        self.records = records
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def lookup(self, six_cards: Iterable[str | int]) -> dict | None:
+        """
+        The stored analysis of a deal, or None if it is not in the database.
+
+        Returns {"my_crib": ..., "opponent_crib": ...}, each a dict with
+        "best_keep" and "best_discard" (card ids in the caller's suits, in
+        deal order), "hand_avg", "crib_avg" and "combined_value", equal to
+        the values `best_keep_from_six` computes. When keeps tie, the one
+        chosen may differ from `best_keep_from_six` on the same deal in
+        another card order.
+        """
+        cards = card_ids(six_cards)
+        (canonical_deal,), perm = canonicalize(cards)
+        key = deal_key(canonical_deal)
+        i = int(np.searchsorted(self.keys, key))
+        if i == len(self.keys) or int(self.keys[i]) != key:
+            return None
+        record = self.records[i]
+        back = inverse_permutation(perm)
+
+        def answer(keep_index: int, hand_avg: float, crib_avg: float, sign: int) -> dict:
+            kept = set(relabel((canonical_deal[p] for p in _KEEP_POSITIONS[keep_index]), back))
+            return {
+                "best_keep": [c for c in cards if c in kept],
+                "best_discard": [c for c in cards if c not in kept],
+                "hand_avg": float(hand_avg),
+                "crib_avg": float(crib_avg),
+                "combined_value": float(hand_avg) + sign * float(crib_avg),
+            }
+
+        return {
+            "my_crib": answer(record["my_keep"], record["my_hand_avg"], record["my_crib_avg"], 1),
+            "opponent_crib": answer(
+                record["opponent_keep"], record["opponent_hand_avg"], record["opponent_crib_avg"], -1
+            ),
+        }
+
+
+def load(path: str | None = None) -> DiscardDB | None:
+    """
+    Memory-map the database, or return None if it is unavailable.
+
+    A file that exists but is not a valid database is ignored with a warning.
+    """
+    path = path or db_path()
+    try:
+        size = os.path.getsize(path)
+    except OSError:
+        return None
+
+    with open(path, "rb") as f:
+        header = f.read(HEADER_SIZE)
+    count = int.from_bytes(header[len(MAGIC) :], "little") if len(header) == HEADER_SIZE else -1
+    if header[: len(MAGIC)] != MAGIC or size != HEADER_SIZE + count * (8 + RECORD_DTYPE.itemsize):
+        warnings.warn(
+            f"Ignoring discard database {path!r}: unknown format; rebuild it with 'python discard_db.py build'"
+        )
+        return None
+
+    keys = np.memmap(path, dtype="<u8", mode="r", offset=HEADER_SIZE, shape=(count,))
+    records = np.memmap(path, dtype=RECORD_DTYPE, mode="r", offset=HEADER_SIZE + 8 * count, shape=(count,))
+    return DiscardDB(keys, records)
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Manage the precomputed optimal-discard database.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build_parser = sub.add_parser("build", help="analyze every deal class and write the database")
+    build_parser.add_argument("--output", default=None, help=f"output path (default: {DEFAULT_PATH})")
+    build_parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="processes to use")
+    build_parser.add_argument("--shards", type=int, default=DEFAULT_SHARDS, help="checkpointed pieces of work")
+    build_parser.add_argument("--limit", type=int, default=None, help="only the first N rank multisets")
+    build_parser.add_argument("--work-dir", default=None, help="checkpoint directory (default: <output>.work)")
+
+    args = parser.parse_args(argv)
+    if args.command == "build":
+        written = build(
+            args.output, workers=args.workers, num_shards=args.shards, limit=args.limit, work_dir=args.work_dir
+        )
+        print(f"Wrote discard database to {written}")
+
+
+if __name__ == "__main__":
+    main()
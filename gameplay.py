@@ -1,11 +1,25 @@
 from __future__ import annotations
 
-from collections import Counter
-from itertools import combinations
-from typing import Iterable, List
+import math
+import random
+import time
+from array import array
+from collections.abc import Mapping
+from concurrent.futures import Executor
+from itertools import combinations, permutations
+from operator import mul
+from typing import Iterable, Iterator, List, Sequence
+
+import numpy as np
+
+import cache
+import metrics
+import pegging
+import score_table
 
 
 RANK_ORDER = "A23456789TJQK"
+SUIT_ORDER = "CDHS"
 RANK_TO_VALUE_FOR_15 = {
     "A": 1,
     "2": 2,
@@ -22,13 +36,33 @@ RANK_TO_VALUE_FOR_15 = {
     "K": 10,
 }
 
+# Compact card model used by all scoring internals.
+#
+# A card is an int id 0-51: rank index * 4 + suit index, so ids follow deck
+# order (AC, AD, AH, AS, 2C, ...). A set of cards is a 52-bit mask with bit
+# `id` set. Card codes like '5C' only appear at the API boundary.
+NUM_CARDS = 52
+CARD_CODES: List[str] = [f"{r}{s}" for r in RANK_ORDER for s in SUIT_ORDER]
+CARD_IDS: dict[str, int] = {code: i for i, code in enumerate(CARD_CODES)}
+CARD_RANK: List[int] = [i // 4 for i in range(NUM_CARDS)]
+CARD_SUIT: List[int] = [i % 4 for i in range(NUM_CARDS)]
+CARD_VALUE: List[int] = [RANK_TO_VALUE_FOR_15[RANK_ORDER[r]] for r in CARD_RANK]
+CARD_BIT: List[int] = [1 << i for i in range(NUM_CARDS)]
+RANK_VALUE: List[int] = [RANK_TO_VALUE_FOR_15[r] for r in RANK_ORDER]
+JACK = RANK_ORDER.index("J")
+FULL_DECK = tuple(range(NUM_CARDS))
+
+# Memory-mapped fifteens/pairs/runs table (see score_table.py), or None if it
+# has not been built, in which case scores are computed directly.
+_SCORE_TABLE = score_table.load()
+
 
 def _parse_card(card: str) -> tuple[str, str]:
     """
     Parse a card string like '5C', 'QH', 'TD' into (rank, suit).
 
     - Rank: one of A,2,3,4,5,6,7,8,9,T,J,Q,K
-    - Suit: single character (e.g. C, D, H, S)
+    - Suit: one of C,D,H,S
     """
     card = card.strip().upper()
     if len(card) != 2:
@@ -36,213 +70,595 @@ def _parse_card(card: str) -> tuple[str, str]:
     rank, suit = card[0], card[1]
     if rank not in RANK_ORDER:
         raise ValueError(f"Invalid rank {rank!r} in card {card!r}")
+    if suit not in SUIT_ORDER:
+        raise ValueError(f"Invalid suit {suit!r} in card {card!r}")
     return rank, suit
 
 
-def _score_core(all_cards: list[tuple[str, str]]) -> int:
+def card_id(card: str | int) -> int:
+    """
+    Convert a card code like '5C' (or an existing card id) into a card id 0-51.
+    """
+    if isinstance(card, int):
+        if not 0 <= card < NUM_CARDS:
+            raise ValueError(f"Card id must be between 0 and {NUM_CARDS - 1}, got {card!r}")
+        return card
+    cid = CARD_IDS.get(card)
+    if cid is None:
+        rank, suit = _parse_card(card)
+        cid = CARD_IDS[rank + suit]
+    return cid
+
+
+def card_ids(cards: Iterable[str | int]) -> List[int]:
+    """Convert card codes (or ids) into a list of card ids."""
+    return [card_id(c) for c in cards]
+
+
+def card_codes(ids: Iterable[int]) -> List[str]:
+    """Convert card ids back into card codes like '5C'."""
+    return [CARD_CODES[c] for c in ids]
+
+
+def hand_mask(ids: Iterable[int]) -> int:
+    """52-bit mask with one bit set per card id."""
+    mask = 0
+    for c in ids:
+        mask |= CARD_BIT[c]
+    return mask
+
+
+# Suit relabelings. Relabeling the suits of every card in a deal (and of the
+# deck) changes no score, so equivalent deals share one canonical form.
+SUIT_PERMUTATIONS: tuple[tuple[int, ...], ...] = tuple(permutations(range(len(SUIT_ORDER))))
+_RELABELED_CARD: List[List[int]] = [
+    [CARD_RANK[c] * 4 + perm[CARD_SUIT[c]] for c in range(NUM_CARDS)] for perm in SUIT_PERMUTATIONS
+]
+_INVERSE_PERMUTATION: List[int] = [
+    SUIT_PERMUTATIONS.index(tuple(perm.index(s) for s in range(len(SUIT_ORDER)))) for perm in SUIT_PERMUTATIONS
+]
+
+
+def relabel(ids: Iterable[int], perm: int) -> List[int]:
+    """Apply suit permutation `perm` (an index into SUIT_PERMUTATIONS) to card ids."""
+    mapping = _RELABELED_CARD[perm]
+    return [mapping[c] for c in ids]
+
+
+def inverse_permutation(perm: int) -> int:
+    """Index of the suit permutation that undoes `perm`."""
+    return _INVERSE_PERMUTATION[perm]
+
+
+def _cache_key(ids: Iterable[int]) -> str:
+    """Compact text form of card ids for result cache keys."""
+    return ",".join(map(str, ids))
+
+
+def canonicalize(*groups: Iterable[int]) -> tuple[tuple[tuple[int, ...], ...], int]:
+    """
+    Map one or more sets of card ids to their suit-isomorphic canonical form.
+
+    Every group is relabeled with the same suit permutation; the canonical
+    form is the lexicographically smallest tuple of sorted groups over all
+    24 permutations. Inputs with equal canonical forms score identically.
+
+    Returns:
+        (canonical_groups, perm) where relabel(group, perm) sorted gives the
+        matching canonical group.
+    """
+    groups = [list(g) for g in groups]
+    best_form = None
+    best_perm = 0
+    for perm, mapping in enumerate(_RELABELED_CARD):
+        form = tuple(tuple(sorted(mapping[c] for c in g)) for g in groups)
+        if best_form is None or form < best_form:
+            best_form = form
+            best_perm = perm
+    return best_form, best_perm
+
+
+# Highest score of any 5-card hand or crib; score histograms have MAX_SCORE + 1 bins.
+MAX_SCORE = 29
+
+
+class StarterStats(Mapping):
+    """
+    Result of `starter_outcome_stats`, read like the dict it describes.
+
+    Per-starter totals live in two small arrays (starter ids and totals)
+    next to the aggregates, which are computed in the same single pass. The
+    "by_starter" dict is only built when that key is read, and `to_dict()`
+    gives the plain JSON-ready dict. `histogram[t]` counts the starters
+    giving a 5-card total of t (None if the totals are unknown).
+    """
+
+    __slots__ = ("base_score", "min_total", "max_total", "avg_total", "avg_delta", "histogram", "starters", "totals")
+    KEYS = ("base_score", "by_starter", "min_total", "max_total", "avg_total", "avg_delta")
+
+    def __init__(
+        self,
+        base_score: int,
+        min_total: int,
+        max_total: int,
+        avg_total: float,
+        avg_delta: float,
+        histogram: array | None = None,
+        starters: array | None = None,
+        totals: array | None = None,
+    ) -> None:
+        self.base_score = base_score
+        self.min_total = min_total
+        self.max_total = max_total
+        self.avg_total = avg_total
+        self.avg_delta = avg_delta
+        self.histogram = histogram
+        self.starters = starters
+        self.totals = totals
+
+    @classmethod
+    def from_totals(
+        cls, base_score: int, starters: Sequence[int], totals: Iterable[int], by_starter: bool = True
+    ) -> "StarterStats":
+        """Stats from the 5-card total for each starter; without `by_starter` only aggregates are kept."""
+        totals = array("B", totals)
+        histogram = array("I", [0]) * (MAX_SCORE + 1)
+        total_sum = 0
+        min_total = max_total = None
+        for total in totals:
+            histogram[total] += 1
+            total_sum += total
+            if min_total is None or total < min_total:
+                min_total = total
+            if max_total is None or total > max_total:
+                max_total = total
+
+        if totals:
+            avg_total = total_sum / len(totals)
+            avg_delta = (total_sum - base_score * len(totals)) / len(totals)
+        else:
+            avg_total = avg_delta = 0.0
+            min_total = max_total = base_score
+        if not by_starter:
+            return cls(base_score, min_total, max_total, avg_total, avg_delta, histogram)
+        return cls(base_score, min_total, max_total, avg_total, avg_delta, histogram, array("B", starters), totals)
+
+    @classmethod
+    def from_dict(cls, stats: dict) -> "StarterStats":
+        """Inverse of `to_dict`."""
+        by_starter = stats["by_starter"]
+        if by_starter is not None:
+            return cls.from_totals(
+                stats["base_score"], card_ids(by_starter), (value["total"] for value in by_starter.values())
+            )
+        return cls(stats["base_score"], stats["min_total"], stats["max_total"], stats["avg_total"], stats["avg_delta"])
+
+    @property
+    def by_starter(self) -> dict[str, dict[str, int]] | None:
+        """{starter_card: {"total": total, "delta": total - base_score}}, or None if not kept."""
+        if self.starters is None:
+            return None
+        base_score = self.base_score
+        return {
+            CARD_CODES[starter]: {"total": total, "delta": total - base_score}
+            for starter, total in zip(self.starters, self.totals)
+        }
+
+    def relabeled(self, perm: int) -> "StarterStats":
+        """Stats with suit permutation `perm` applied to the starters, kept in deck order."""
+        if self.starters is None or perm == 0:
+            return self
+        mapping = _RELABELED_CARD[perm]
+        pairs = sorted(zip((mapping[c] for c in self.starters), self.totals))
+        return StarterStats(
+            self.base_score,
+            self.min_total,
+            self.max_total,
+            self.avg_total,
+            self.avg_delta,
+            self.histogram,
+            array("B", (starter for starter, _ in pairs)),
+            array("B", (total for _, total in pairs)),
+        )
+
+    def to_dict(self) -> dict:
+        return {key: self[key] for key in self.KEYS}
+
+    def __getitem__(self, key: str):
+        if key not in self.KEYS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.KEYS)
+
+    def __len__(self) -> int:
+        return len(self.KEYS)
+
+    def __repr__(self) -> str:
+        return f"StarterStats({self.to_dict()!r})"
+
+
+class CribStats(Mapping):
+    """
+    Exact result of `crib_outcome_stats`, read like the dict it describes.
+
+    Per-starter averages live in two small arrays (starter ids and averages)
+    next to the aggregates, which are kept as running values while the cribs
+    are scored. "by_starter" is only built when read, and `to_dict()` gives
+    the plain JSON-ready dict. Every engine gives the same fields; unlike
+    StarterStats there is no score histogram, since the rank_class engine
+    never sees single cribs.
     """
-    Core cribbage scoring for fifteens, pairs, and runs.
 
-    Works with any number of cards >= 2. Does NOT handle flush or knobs.
+    __slots__ = ("avg_score", "min_score", "max_score", "starters", "starter_avgs")
+    KEYS = ("avg_score", "min_score", "max_score", "by_starter")
+
+    def __init__(
+        self,
+        avg_score: float,
+        min_score: float | None,
+        max_score: float | None,
+        starters: array | None = None,
+        starter_avgs: array | None = None,
+    ) -> None:
+        self.avg_score = avg_score
+        self.min_score = min_score
+        self.max_score = max_score
+        self.starters = starters
+        self.starter_avgs = starter_avgs
+
+    @classmethod
+    def from_summaries(
+        cls, available: List[int], summaries: Iterable[tuple[int, int, int | None, int | None]]
+    ) -> "CribStats":
+        """Combine per-starter (sum, count, min, max) tuples, e.g. from `_crib_rank_class_summaries`."""
+        starter_avgs = array("d")
+        total_sum = total_count = 0
+        min_score = max_score = None
+
+        for score_sum, num_cribs, lo, hi in summaries:
+            if not num_cribs:
+                starter_avgs.append(0.0)
+                continue
+            starter_avgs.append(score_sum / num_cribs)
+            total_sum += score_sum
+            total_count += num_cribs
+            if min_score is None or lo < min_score:
+                min_score = lo
+            if max_score is None or hi > max_score:
+                max_score = hi
+
+        if total_count:
+            avg_score = total_sum / total_count
+        else:
+            avg_score = min_score = max_score = 0.0
+        return cls(avg_score, min_score, max_score, array("B", available), starter_avgs)
+
+    @classmethod
+    def from_scores(cls, available: List[int], scores_by_starter: Iterable[Iterable[int]]) -> "CribStats":
+        """Stats from every crib's score, grouped by starter in `available` order."""
+        starter_avgs = array("d")
+        histogram = array("I", [0]) * (MAX_SCORE + 1)
+        for starter_scores in scores_by_starter:
+            starter_sum = starter_count = 0
+            for score in starter_scores:
+                histogram[score] += 1
+                starter_sum += score
+                starter_count += 1
+            starter_avgs.append(starter_sum / starter_count if starter_count else 0.0)
+
+        scores = [score for score, count in enumerate(histogram) if count]
+        if scores:
+            num_cribs = sum(histogram)
+            avg_score = sum(score * count for score, count in enumerate(histogram)) / num_cribs
+            min_score, max_score = scores[0], scores[-1]
+        else:
+            avg_score = min_score = max_score = 0.0
+        return cls(avg_score, min_score, max_score, array("B", available), starter_avgs)
+
+    @classmethod
+    def from_dict(cls, stats: dict) -> "CribStats":
+        """Inverse of `to_dict`."""
+        by_starter = stats["by_starter"]
+        if by_starter is None:
+            return cls(stats["avg_score"], stats["min_score"], stats["max_score"])
+        return cls(
+            stats["avg_score"],
+            stats["min_score"],
+            stats["max_score"],
+            array("B", card_ids(by_starter)),
+            array("d", by_starter.values()),
+        )
+
+    @property
+    def by_starter(self) -> dict[str, float] | None:
+        """{starter_card: average crib score with that starter}, or None if not kept."""
+        if self.starters is None:
+            return None
+        return {CARD_CODES[starter]: avg for starter, avg in zip(self.starters, self.starter_avgs)}
+
+    def relabeled(self, perm: int) -> "CribStats":
+        """Stats with suit permutation `perm` applied to the starters, kept in deck order."""
+        if self.starters is None or perm == 0:
+            return self
+        mapping = _RELABELED_CARD[perm]
+        pairs = sorted(zip((mapping[c] for c in self.starters), self.starter_avgs))
+        return CribStats(
+            self.avg_score,
+            self.min_score,
+            self.max_score,
+            array("B", (starter for starter, _ in pairs)),
+            array("d", (avg for _, avg in pairs)),
+        )
+
+    def to_dict(self) -> dict:
+        return {key: self[key] for key in self.KEYS}
+
+    def __getitem__(self, key: str):
+        if key not in self.KEYS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.KEYS)
+
+    def __len__(self) -> int:
+        return len(self.KEYS)
+
+    def __repr__(self) -> str:
+        return f"CribStats({self.to_dict()!r})"
+
+
+def to_jsonable(value):
+    """Copy of `value` with every StarterStats/CribStats replaced by its dict."""
+    if isinstance(value, (StarterStats, CribStats)):
+        return value.to_dict()
+    if isinstance(value, dict):
+        return {key: to_jsonable(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [to_jsonable(item) for item in value]
+    return value
+
+
+def _relabel_stats(stats: Mapping | None, perm: int) -> Mapping | None:
+    """Starter/crib stats with their starters relabeled by `perm`."""
+    if stats is None:
+        return None
+    if isinstance(stats, (StarterStats, CribStats)):
+        return stats.relabeled(perm)
+    # Estimates from random cribs have no per-starter data to relabel.
+    return dict(stats)
+
+
+def _core_items(
+    ranks: Sequence[int], fifteens: List[tuple[int, ...]] | None = None
+) -> tuple[List[tuple[int, ...]], List[tuple[int, int]], List[tuple[tuple[int, ...], int]]]:
     """
-    total_points = 0
+    Every fifteen, pair and run in a hand, as positions into `ranks`.
 
+    Takes rank indices (0 = ace, 12 = king). Works with any number of
+    cards >= 2. Does NOT handle flush or knobs.
+
+    Returns (fifteens, pairs, runs): the positions of each combination
+    summing to 15 and of each pair, and per run the positions of one card of
+    each rank plus the run's multiplicity (e.g. 2 for 5-5-6-7). Callers that
+    already know the fifteens can pass them in.
+    """
     # Fifteens: any combination of cards that sums to 15 is worth 2 points.
-    values = [RANK_TO_VALUE_FOR_15[r] for r, _ in all_cards]
-    for r in range(2, len(values) + 1):
-        for combo in combinations(values, r):
-            if sum(combo) == 15:
-                total_points += 2
+    if fifteens is None:
+        values = [RANK_VALUE[r] for r in ranks]
+        fifteens = [
+            combo
+            for r in range(2, len(values) + 1)
+            for combo in combinations(range(len(values)), r)
+            if sum(values[i] for i in combo) == 15
+        ]
 
     # Pairs: each pair of same-rank cards scores 2.
-    rank_counts = Counter(r for r, _ in all_cards)
-    for count in rank_counts.values():
-        if count >= 2:
-            num_pairs = count * (count - 1) // 2
-            total_points += num_pairs * 2
-
-    # Runs: work off rank indices and multiplicities.
-    index_counts = Counter(RANK_ORDER.index(r) for r, _ in all_cards)
-    distinct_indices: List[int] = sorted(index_counts.keys())
-
-    def _score_runs(indices: List[int], counts: Counter) -> int:
-        run_points = 0
-        if not indices:
-            return 0
-
-        start = 0
-        while start < len(indices):
-            end = start
-            while end + 1 < len(indices) and indices[end + 1] == indices[end] + 1:
-                end += 1
-
-            segment = indices[start : end + 1]
-            length = len(segment)
-            if length >= 3:
-                multiplicity = 1
-                for idx in segment:
-                    multiplicity *= counts[idx]
-                run_points += length * multiplicity
-
-            start = end + 1
-
-        return run_points
-
-    total_points += _score_runs(distinct_indices, index_counts)
+    positions: dict[int, List[int]] = {}
+    for i, r in enumerate(ranks):
+        positions.setdefault(r, []).append(i)
+    pairs = [pair for same_rank in positions.values() for pair in combinations(same_rank, 2)]
+
+    # Runs: maximal stretches of 3+ consecutive ranks, counted once per way
+    # of picking one card of each rank.
+    runs = []
+    distinct = sorted(positions)
+    start = 0
+    while start < len(distinct):
+        end = start
+        while end + 1 < len(distinct) and distinct[end + 1] == distinct[end] + 1:
+            end += 1
+        segment = distinct[start : end + 1]
+        if len(segment) >= 3:
+            multiplicity = 1
+            for r in segment:
+                multiplicity *= len(positions[r])
+            runs.append((tuple(positions[r][0] for r in segment), multiplicity))
+        start = end + 1
+
+    return fifteens, pairs, runs
+
+
+def _score_core(ranks: Sequence[int]) -> int:
+    """
+    Fifteens, pairs and runs points for rank indices (see `_core_items`).
+    """
+    fifteens, pairs, runs = _core_items(ranks)
+    return 2 * len(fifteens) + 2 * len(pairs) + sum(len(run) * multiplicity for run, multiplicity in runs)
+
+
+def _core_points(ranks: Sequence[int]) -> int:
+    """
+    Fifteens, pairs and runs for 4 or 5 rank indices.
+
+    Uses the precomputed score table when it is loaded, falling back to
+    `_score_core` otherwise.
+    """
+    if _SCORE_TABLE is None:
+        return _score_core(ranks)
+    return _SCORE_TABLE[score_table.table_index(ranks)]
+
+
+def _flush_points(ids: Sequence[int], is_crib: bool) -> int:
+    """
+    Flush points for 4 or 5 card ids; with 5 cards the last one is the starter.
+
+    - Without a starter (4 cards): 4-card flush scores 4 (never used in crib).
+    - With starter:
+        * Non-crib: 4 cards same suit = 4; if starter matches too = 5.
+        * Crib: needs all 5 same suit for 5 points; otherwise no flush.
+    """
+    suit = CARD_SUIT[ids[0]]
+    if not (CARD_SUIT[ids[1]] == suit and CARD_SUIT[ids[2]] == suit and CARD_SUIT[ids[3]] == suit):
+        return 0
+    if len(ids) == 4:
+        return 4
+    if CARD_SUIT[ids[4]] == suit:
+        return 5
+    return 0 if is_crib else 4
+
+
+def _knobs_position(ids: Sequence[int]) -> int | None:
+    """Position of the jack matching the starter's suit (scores 1), if any."""
+    if len(ids) < 5:
+        return None
+    starter_suit = CARD_SUIT[ids[4]]
+    for i in range(4):
+        if CARD_RANK[ids[i]] == JACK and CARD_SUIT[ids[i]] == starter_suit:
+            return i
+    return None
+
+
+def _score_ids(ids: Sequence[int], is_crib: bool = False) -> int:
+    """
+    Score 4 or 5 card ids; with 5 cards the last one is the starter.
+
+    This is `score_hand` without parsing or validation, for hot loops.
+    """
+    # Core scoring (15s, pairs, runs), then flush and knobs.
+    total_points = _core_points([CARD_RANK[c] for c in ids]) + _flush_points(ids, is_crib)
+    if _knobs_position(ids) is not None:
+        total_points += 1
     return total_points
 
 
-def get_scoring_breakdown(cards: Iterable[str], *, is_crib: bool = False) -> dict:
+def _breakdown_ids(
+    ids: Sequence[int], is_crib: bool = False, fifteens: List[tuple[int, ...]] | None = None
+) -> dict:
+    """
+    `get_scoring_breakdown` for card ids, without parsing or validation.
+
+    Uses the same rules as `_score_ids`, item by item. `fifteens` is passed
+    through to `_core_items`.
+    """
+    codes = [CARD_CODES[c] for c in ids]
+    fifteen_items, pair_items, run_items = _core_items([CARD_RANK[c] for c in ids], fifteens)
+
+    breakdown = {
+        "total": 0,
+        "fifteens": [{"cards": [codes[i] for i in combo], "points": 2} for combo in fifteen_items],
+        "pairs": [{"cards": [codes[i] for i in pair], "points": 2} for pair in pair_items],
+        "runs": [
+            {
+                "cards": [codes[i] for i in run],  # one instance of the run
+                "points": len(run) * multiplicity,
+                "length": len(run),
+                "multiplicity": multiplicity,
+            }
+            for run, multiplicity in run_items
+        ],
+        "flush": None,
+        "knobs": None,
+    }
+    total = 2 * len(fifteen_items) + 2 * len(pair_items) + sum(run["points"] for run in breakdown["runs"])
+
+    flush_points = _flush_points(ids, is_crib)
+    if flush_points:
+        # A 4-point flush is the 4 hand cards, a 5-point one includes the starter.
+        breakdown["flush"] = {"cards": codes[:flush_points], "points": flush_points}
+        total += flush_points
+
+    knob = _knobs_position(ids)
+    if knob is not None:
+        breakdown["knobs"] = {"card": codes[knob], "points": 1}
+        total += 1
+
+    breakdown["total"] = total
+    return breakdown
+
+
+@metrics.timed
+def get_scoring_breakdown(cards: Iterable[str | int], *, is_crib: bool = False) -> dict:
     """
     Get a detailed breakdown of how a hand is scored.
-    
+
+    Same as `score_hand(cards, is_crib=is_crib, breakdown=True)`.
+
     Returns a dict with:
         - "total": total score
         - "fifteens": list of 15 combinations, each with {"cards": [...], "points": 2}
         - "pairs": list of pairs, each with {"cards": [...], "points": 2}
-        - "runs": list of runs, each with {"cards": [...], "points": int}
+        - "runs": list of runs, each with {"cards": [...], "points": int,
+          "length": int, "multiplicity": int}; "cards" holds one card per rank
         - "flush": {"cards": [...], "points": int} or None
         - "knobs": {"card": str, "points": 1} or None
     """
-    cards = list(cards)
-    if len(cards) not in (4, 5):
-        raise ValueError("Cribbage hand must have 4 or 5 cards")
-    
-    parsed = [_parse_card(c) for c in cards]
-    
-    if len(parsed) == 5:
-        hand_cards = parsed[:4]
-        starter = parsed[4]
-    else:
-        hand_cards = parsed
-        starter = None
-    
-    all_cards = hand_cards + ([starter] if starter else [])
-    card_strings = cards[:4] + ([cards[4]] if starter else [])
-    
-    breakdown = {
-        "total": 0,
-        "fifteens": [],
-        "pairs": [],
-        "runs": [],
-        "flush": None,
-        "knobs": None,
-    }
-    
-    # Fifteens
-    values = [RANK_TO_VALUE_FOR_15[r] for r, _ in all_cards]
-    for r in range(2, len(values) + 1):
-        for combo_indices in combinations(range(len(values)), r):
-            combo_values = [values[i] for i in combo_indices]
-            if sum(combo_values) == 15:
-                combo_cards = [card_strings[i] for i in combo_indices]
-                breakdown["fifteens"].append({"cards": combo_cards, "points": 2})
-                breakdown["total"] += 2
-    
-    # Pairs
-    rank_counts = Counter(r for r, _ in all_cards)
-    for rank, count in rank_counts.items():
-        if count >= 2:
-            # Find all cards with this rank
-            rank_cards = [card_strings[i] for i, (r, _) in enumerate(all_cards) if r == rank]
-            # Generate all pairs
-            for pair in combinations(rank_cards, 2):
-                breakdown["pairs"].append({"cards": list(pair), "points": 2})
-                breakdown["total"] += 2
-    
-    # Runs
-    index_counts = Counter(RANK_ORDER.index(r) for r, _ in all_cards)
-    distinct_indices: List[int] = sorted(index_counts.keys())
-    
-    def _get_runs(indices: List[int], counts: Counter) -> List[dict]:
-        runs = []
-        if not indices:
-            return runs
-        
-        start = 0
-        while start < len(indices):
-            end = start
-            while end + 1 < len(indices) and indices[end + 1] == indices[end] + 1:
-                end += 1
-            
-            segment = indices[start : end + 1]
-            length = len(segment)
-            if length >= 3:
-                multiplicity = 1
-                for idx in segment:
-                    multiplicity *= counts[idx]
-                
-                # Get all cards in this run
-                run_cards = []
-                for idx in segment:
-                    rank = RANK_ORDER[idx]
-                    # Find all cards with this rank
-                    for i, (r, _) in enumerate(all_cards):
-                        if r == rank:
-                            run_cards.append(card_strings[i])
-                
-                # Generate all combinations accounting for multiplicity
-                # For simplicity, we'll show one representative run
-                # The actual points = length * multiplicity
-                runs.append({
-                    "cards": run_cards[:length],  # Show one instance of the run
-                    "points": length * multiplicity,
-                    "length": length,
-                    "multiplicity": multiplicity,
-                })
-            
-            start = end + 1
-        
-        return runs
-    
-    runs = _get_runs(distinct_indices, index_counts)
-    for run in runs:
-        breakdown["runs"].append(run)
-        breakdown["total"] += run["points"]
-    
-    # Flush
-    hand_suits = [s for _, s in hand_cards]
-    flush_points = 0
-    flush_cards = None
-    
-    if len(hand_cards) == 4 and len(set(hand_suits)) == 1:
-        if starter is None:
-            flush_points = 4
-            flush_cards = card_strings[:4]
-        else:
-            if is_crib:
-                starter_suit = starter[1]
-                if starter_suit == hand_suits[0]:
-                    flush_points = 5
-                    flush_cards = card_strings
-            else:
-                flush_points = 4
-                flush_cards = card_strings[:4]
-                starter_suit = starter[1]
-                if starter_suit == hand_suits[0]:
-                    flush_points = 5
-                    flush_cards = card_strings
-    
-    if flush_points > 0:
-        breakdown["flush"] = {"cards": flush_cards, "points": flush_points}
-        breakdown["total"] += flush_points
-    
-    # Knobs
-    if starter is not None:
-        starter_suit = starter[1]
-        for i, (r, s) in enumerate(hand_cards):
-            if r == "J" and s == starter_suit:
-                breakdown["knobs"] = {"card": card_strings[i], "points": 1}
-                breakdown["total"] += 1
-                break
-    
-    return breakdown
+    return score_hand(cards, is_crib=is_crib, breakdown=True)
 
 
-def score_hand(cards: Iterable[str], *, is_crib: bool = False) -> int:
+@metrics.timed
+def breakdowns_by_starter(
+    hand: Iterable[str | int],
+    *,
+    is_crib: bool = False,
+    deck: Iterable[str | int] | None = None,
+) -> dict[str, dict]:
+    """
+    `get_scoring_breakdown` of a 4-card hand with every possible starter.
+
+    Arguments are as for `starter_outcome_stats`. Combinations of the hand
+    cards are summed once and shared by all starters, so this is much cheaper
+    than one breakdown call per starter.
+
+    Returns:
+        {starter_card: breakdown} in deck order.
+    """
+    hand = card_ids(hand)
+    if len(hand) != 4:
+        raise ValueError("breakdowns_by_starter expects exactly 4 cards in hand")
+
+    full_deck = FULL_DECK if deck is None else card_ids(deck)
+    hand_bits = hand_mask(hand)
+    candidates = [c for c in full_deck if not hand_bits & CARD_BIT[c]]
+
+    values = [CARD_VALUE[c] for c in hand]
+    subset_sums = [
+        (combo, sum(values[i] for i in combo)) for r in range(1, 5) for combo in combinations(range(4), r)
+    ]
+    hand_fifteens = [combo for combo, total in subset_sums if len(combo) >= 2 and total == 15]
+    fifteens_by_value: dict[int, List[tuple[int, ...]]] = {}
+
+    breakdowns = {}
+    for starter in candidates:
+        value = CARD_VALUE[starter]
+        if value not in fifteens_by_value:
+            # The starter (position 4) completes any hand subset summing to 15 - value.
+            with_starter = [(*combo, 4) for combo, total in subset_sums if total == 15 - value]
+            fifteens_by_value[value] = sorted(hand_fifteens + with_starter, key=lambda combo: (len(combo), combo))
+        breakdowns[CARD_CODES[starter]] = _breakdown_ids([*hand, starter], is_crib, fifteens_by_value[value])
+    return breakdowns
+
+
+@metrics.timed
+def score_hand(cards: Iterable[str | int], *, is_crib: bool = False, breakdown: bool = False) -> int | dict:
     """
     Compute the cribbage score for a hand.
 
+    Returns the total, or with `breakdown=True` the item-level breakdown
+    described in `get_scoring_breakdown`.
+
     Usage:
         - For a regular 4-card hand without a starter (no flush/knobs logic), pass 4 cards.
         - For a full 5-card hand (4 cards + starter), pass 5 cards; the **last card is
@@ -250,6 +666,7 @@ def score_hand(cards: Iterable[str], *, is_crib: bool = False) -> int:
 
     Card format:
         Each card is a 2-character string: rank + suit, e.g. '5C', 'QH', 'TD', 'AS'.
+        Card ids (0-51, see CARD_CODES) are accepted as well.
 
     Rules implemented:
         - All 15s (2 points per combination)
@@ -258,66 +675,96 @@ def score_hand(cards: Iterable[str], *, is_crib: bool = False) -> int:
         - Flush (depends on is_crib and whether a starter is present)
         - Knobs (Jack in hand matching starter suit, only when a starter is present)
     """
-    cards = list(cards)
-    if len(cards) not in (4, 5):
+    ids = card_ids(cards)
+    if len(ids) not in (4, 5):
         raise ValueError("Cribbage hand must have 4 or 5 cards")
 
-    parsed = [_parse_card(c) for c in cards]
+    if breakdown:
+        return _breakdown_ids(ids, is_crib)
+    return _score_ids(ids, is_crib)
 
-    if len(parsed) == 5:
-        hand_cards = parsed[:4]
-        starter = parsed[4]
-    else:
-        hand_cards = parsed
-        starter = None
-
-    all_cards = hand_cards + ([starter] if starter else [])
-
-    # Core scoring (15s, pairs, runs).
-    total_points = _score_core(all_cards)
-
-    # 4) Flush:
-    # - Without a starter (4 cards): 4-card flush scores 4 (never used in crib).
-    # - With starter:
-    #     * Non-crib: 4 cards same suit = 4; if starter matches too = 5.
-    #     * Crib: needs all 5 same suit for 5 points; otherwise no flush.
-    hand_suits = [s for _, s in hand_cards]
-    flush_points = 0
-
-    if len(hand_cards) == 4 and len(set(hand_suits)) == 1:
-        if starter is None:
-            # Classic 4-card hand, no starter yet.
-            flush_points = 4
-        else:
-            if is_crib:
-                # Crib needs all 5 same suit.
-                starter_suit = starter[1]
-                if starter_suit == hand_suits[0]:
-                    flush_points = 5
-            else:
-                # Hand: flush with 4 in hand; +1 if starter matches.
-                flush_points = 4
-                starter_suit = starter[1]
-                if starter_suit == hand_suits[0]:
-                    flush_points = 5
-
-    total_points += flush_points
-
-    # 5) Knobs: Jack in hand matching the starter suit scores 1.
-    if starter is not None:
-        starter_suit = starter[1]
-        if any(r == "J" and s == starter_suit for r, s in hand_cards):
-            total_points += 1
 
-    return total_points
+def _subset_matrix(num_cards: int) -> np.ndarray:
+    """0/1 matrix with one row per subset (size >= 2) of `num_cards` positions."""
+    rows = []
+    for size in range(2, num_cards + 1):
+        for combo in combinations(range(num_cards), size):
+            rows.append([1 if i in combo else 0 for i in range(num_cards)])
+    return np.array(rows, dtype=np.int64)
+
 
+_BATCH_SUBSETS = {4: _subset_matrix(4), 5: _subset_matrix(5)}
 
+
+def score_hands_batch(hands: np.ndarray, is_crib: bool = False) -> np.ndarray:
+    """
+    Score many hands at once with array operations.
+
+    Arguments:
+        hands:
+            Integer array of card ids with shape (N, 5), the starter in the
+            last column, or shape (N, 4) for hands without a starter.
+        is_crib:
+            Whether every hand is a crib (affects flush logic).
+
+    Returns:
+        An int64 array of N scores, equal to `score_hand` on each row.
+    """
+    hands = np.asarray(hands, dtype=np.int64)
+    if hands.ndim != 2 or hands.shape[1] not in (4, 5):
+        raise ValueError("score_hands_batch expects an array of shape (N, 4) or (N, 5)")
+    num_cards = hands.shape[1]
+
+    ranks = hands // 4
+    suits = hands % 4
+    values = np.minimum(ranks + 1, 10)
+
+    # Fifteens: sum the values of every subset in one matrix product.
+    subset_sums = values @ _BATCH_SUBSETS[num_cards].T
+    points = 2 * (subset_sums == 15).sum(axis=1)
+
+    # Rank histogram, stored rank-major so each rank is a contiguous row.
+    rows = np.arange(len(hands))
+    counts = np.zeros((len(RANK_ORDER), len(hands)), dtype=np.int64)
+    for position in range(num_cards):
+        counts[ranks[:, position], rows] += 1
+
+    # Pairs: c cards of a rank make c * (c - 1) / 2 pairs worth 2 each.
+    points += (counts * (counts - 1)).sum(axis=0)
+
+    # Runs: sweep the ranks once, tracking the length and multiplicity of the
+    # current stretch of present ranks; a stretch of 3+ scores length *
+    # multiplicity when it ends. The trailing zero row closes runs ending at K.
+    run_length = np.zeros(len(hands), dtype=np.int64)
+    run_multiplicity = np.ones(len(hands), dtype=np.int64)
+    for column in (*counts, np.zeros(len(hands), dtype=np.int64)):
+        present = column > 0
+        points += np.where(~present & (run_length >= 3), run_length * run_multiplicity, 0)
+        run_length = np.where(present, run_length + 1, 0)
+        run_multiplicity = np.where(present, run_multiplicity * column, 1)
+
+    # Flush and knobs, following the same rules as _score_ids.
+    hand_is_flush = (suits[:, :4] == suits[:, :1]).all(axis=1)
+    if num_cards == 4:
+        return points + 4 * hand_is_flush
+
+    starter_matches = suits[:, 4] == suits[:, 0]
+    points += 5 * (hand_is_flush & starter_matches)
+    if not is_crib:
+        points += 4 * (hand_is_flush & ~starter_matches)
+    points += ((ranks[:, :4] == JACK) & (suits[:, :4] == suits[:, 4:])).any(axis=1)
+    return points
+
+
+@metrics.timed
 def starter_outcome_stats(
-    hand: Iterable[str],
+    hand: Iterable[str | int],
     *,
     is_crib: bool = False,
-    deck: Iterable[str] | None = None,
-) -> dict:
+    deck: Iterable[str | int] | None = None,
+    engine: str = "rank_class",
+    by_starter: bool = True,
+) -> StarterStats:
     """
     For a chosen 4‑card hand, evaluate how different starter cards affect the score.
 
@@ -332,9 +779,17 @@ def starter_outcome_stats(
         deck:
             Optional iterable of all cards that could be cut as starter.
             If omitted, uses a full 52‑card deck and excludes the 4 hand cards.
+        engine:
+            "rank_class" (default) scores fifteens, pairs and runs once per
+            starter rank and adds flush and knobs per starter suit (see
+            `_starter_totals_by_rank`). "python" scores each starter in turn;
+            "numpy" scores all of them with one `score_hands_batch` call.
+            All engines give identical results.
+        by_starter:
+            If False, "by_starter" is None and only the aggregates are built.
 
     Returns:
-        A dict with:
+        A StarterStats, a read-only mapping with (`to_dict()` for a plain dict):
             - "base_score": score of the 4‑card hand with no starter
             - "by_starter": {starter_card: {"total": total_score, "delta": delta}}
                   where:
@@ -343,60 +798,439 @@ def starter_outcome_stats(
             - "min_total", "max_total"
             - "avg_total", "avg_delta"
     """
-    hand = list(hand)
+    hand = card_ids(hand)
     if len(hand) != 4:
         raise ValueError("starter_outcome_stats expects exactly 4 cards in hand")
 
+    # Not cached: scoring the starters is cheaper than a result cache lookup.
+    full_deck = FULL_DECK if deck is None else card_ids(deck)
+    return _starter_outcome_stats(hand, is_crib, full_deck, engine, by_starter)
+
+
+def _starter_totals_by_rank(hand: List[int], is_crib: bool, candidates: List[int]) -> List[int]:
+    """
+    5-card totals for each candidate starter, scoring each starter rank once.
+
+    Fifteens, pairs and runs only depend on the starter's rank, so they are
+    looked up for the (at most 13) candidate ranks. Flush and knobs only
+    depend on its suit:
+        - flush: 5 if the hand is a flush in the starter's suit, otherwise
+          4 for a non-crib flush hand, else 0
+        - knobs: 1 if the hand holds the jack of the starter's suit
+    """
+    hand_ranks = [CARD_RANK[c] for c in hand]
+    core_by_rank = {r: _core_points([*hand_ranks, r]) for r in {CARD_RANK[c] for c in candidates}}
+
+    suit = CARD_SUIT[hand[0]]
+    hand_is_flush = all(CARD_SUIT[c] == suit for c in hand[1:])
+    adjust_by_suit = []
+    for starter_suit in range(len(SUIT_ORDER)):
+        flush = (5 if starter_suit == suit else 0 if is_crib else 4) if hand_is_flush else 0
+        knobs = 1 if JACK * 4 + starter_suit in hand else 0
+        adjust_by_suit.append(flush + knobs)
+
+    return [core_by_rank[CARD_RANK[c]] + adjust_by_suit[CARD_SUIT[c]] for c in candidates]
+
+
+def _starter_outcome_stats(
+    hand: List[int], is_crib: bool, full_deck: Sequence[int], engine: str, by_starter: bool = True
+) -> StarterStats:
+    """`starter_outcome_stats` over the starters in `full_deck`."""
     # Base score with no starter: this represents what the 4 cards are worth alone.
-    base_score = score_hand(hand, is_crib=is_crib)
+    base_score = _score_ids(hand, is_crib)
 
     # Build candidate starter list.
-    if deck is None:
-        ranks = RANK_ORDER
-        suits = "CDHS"
-        full_deck = [f"{r}{s}" for r in ranks for s in suits]
+    hand_bits = hand_mask(hand)
+    candidates = [c for c in full_deck if not hand_bits & CARD_BIT[c]]
+
+    if engine == "rank_class":
+        starter_totals = _starter_totals_by_rank(hand, is_crib, candidates)
+    elif engine == "python":
+        starter_totals = [_score_ids([*hand, starter], is_crib) for starter in candidates]
+    elif engine == "numpy":
+        grid = np.array([[*hand, starter] for starter in candidates], dtype=np.int64).reshape(-1, 5)
+        starter_totals = score_hands_batch(grid, is_crib=is_crib).tolist()
     else:
-        full_deck = [c.strip().upper() for c in deck]
+        raise ValueError(f"Unknown engine {engine!r}")
 
-    hand_set = {c.strip().upper() for c in hand}
-    candidates = [c for c in full_deck if c not in hand_set]
+    return StarterStats.from_totals(base_score, candidates, starter_totals, by_starter)
 
-    by_starter: dict[str, dict[str, float]] = {}
-    totals: List[int] = []
-    deltas: List[int] = []
 
-    for starter in candidates:
-        total = score_hand([*hand, starter], is_crib=is_crib)
-        delta = total - base_score
-        by_starter[starter] = {"total": total, "delta": delta}
-        totals.append(total)
-        deltas.append(delta)
-
-    if totals:
-        avg_total = sum(totals) / len(totals)
-        avg_delta = sum(deltas) / len(deltas)
-        min_total = min(totals)
-        max_total = max(totals)
-    else:
-        avg_total = avg_delta = 0.0
-        min_total = max_total = base_score
+def _crib_scores_for_starter(discard: List[int], available: List[int], starter: int) -> List[int]:
+    """Crib scores for one starter over every pair of opponent discards."""
+    # Remaining cards after removing starter (for opponent's 2 discards)
+    remaining_for_opponent = [c for c in available if c != starter]
 
-    return {
-        "base_score": base_score,
-        "by_starter": by_starter,
-        "min_total": min_total,
-        "max_total": max_total,
-        "avg_total": avg_total,
-        "avg_delta": avg_delta,
-    }
+    starter_scores: List[int] = []
+
+    # Evaluate all possible pairs of opponent discards
+    for opp_discard1, opp_discard2 in combinations(remaining_for_opponent, 2):
+        # Full crib: 2 your discards + 2 opponent discards + starter = 5 cards
+        crib_cards = [*discard, opp_discard1, opp_discard2, starter]
+        starter_scores.append(_score_ids(crib_cards, True))
+
+    return starter_scores
+
+
+def _crib_grid(discard: List[int], available: List[int]) -> np.ndarray:
+    """
+    Every crib for `crib_outcome_stats` as an (N, 5) array of card ids.
+
+    Rows are grouped by starter in `available` order, and within a starter
+    the opponent discards follow `combinations` order.
+    """
+    cards = np.array(available, dtype=np.int64)
+    first, second = np.triu_indices(len(cards), k=1)
+    blocks = []
+    for k, starter in enumerate(available):
+        mask = (first != k) & (second != k)
+        block = np.empty((int(mask.sum()), 5), dtype=np.int64)
+        block[:, 0] = discard[0]
+        block[:, 1] = discard[1]
+        block[:, 2] = cards[first[mask]]
+        block[:, 3] = cards[second[mask]]
+        block[:, 4] = starter
+        blocks.append(block)
+    if not blocks:
+        return np.empty((0, 5), dtype=np.int64)
+    return np.concatenate(blocks)
+
+
+def _opponent_rank_groups(counts: List[int]) -> List[tuple[int, int, int]]:
+    """(r1, r2, number of card pairs) for every rank pair drawn from `counts` cards per rank."""
+    groups: List[tuple[int, int, int]] = []
+    for r1, c1 in enumerate(counts):
+        if not c1:
+            continue
+        for r2 in range(r1, len(counts)):
+            pairs = c1 * (c1 - 1) // 2 if r1 == r2 else c1 * counts[r2]
+            if pairs:
+                groups.append((r1, r2, pairs))
+    return groups
+
+
+def _group_cores(prefix: List[int], groups: List[tuple[int, int, int]], offsets: List[int]) -> List[int]:
+    """
+    Core points of `prefix` (3 ranks) plus each group's rank pair.
+
+    `offsets` holds r1 * 13 + r2 per group: the opponent's ranks are the last
+    two digits of a table index, so each lookup is one addition.
+    """
+    if _SCORE_TABLE is not None:
+        base = score_table.table_index([*prefix, 0, 0])
+        return [_SCORE_TABLE[base + offset] for offset in offsets]
+    return [_core_points([*prefix, r1, r2]) for r1, r2, _ in groups]
+
+
+def _crib_rank_class_summaries(
+    discards: List[List[int]], available: List[int], starters: Iterable[int] | None = None
+) -> List[List[tuple[int, int, int | None, int | None]]]:
+    """
+    Exact crib totals for one or more discards without scoring every crib.
+
+    For each starter (by default every card in `available`), returns one
+    (score_sum, num_cribs, min_score, max_score) tuple per discard, taken
+    over every pair of opponent discards from the other available cards.
+    The discards must not overlap `available`.
+
+    Fifteens, pairs and runs only depend on ranks, so opponent discards are
+    grouped by rank pair (at most 91 groups) and each group is scored once,
+    weighted by how many card pairs it contains. Within a group only two
+    things depend on suits, and both are counted directly:
+
+        - 5-card flush: discard, opponent pair and starter all in one suit.
+          At most one card pair per rank pair (ranks differ) can do this.
+        - Knobs: the jack of the starter's suit among the 4 crib cards. It is
+          either in the discard (every pair gets it) or available to the
+          opponent (only pairs holding that jack get it).
+
+    The rank groups and their scores depend only on the starter's rank, so
+    they are built once per starter rank and shared by its suits and by all
+    discards. Per starter, only the few "special" groups holding a flush
+    pair or the knob jack need pair-level counts; every other crib scores
+    its group's core points plus the knob bonus.
+    """
+    starters = available if starters is None else list(starters)
+    num_ranks = len(RANK_ORDER)
+    available_bits = hand_mask(available)
+    rank_counts = [0] * num_ranks
+    for c in available:
+        rank_counts[CARD_RANK[c]] += 1
+
+    discard_ranks = [[CARD_RANK[c] for c in discard] for discard in discards]
+    discard_suits = [
+        CARD_SUIT[discard[0]] if CARD_SUIT[discard[0]] == CARD_SUIT[discard[1]] else None for discard in discards
+    ]
+
+    starters_by_rank: dict[int, List[int]] = {}
+    for starter in starters:
+        starters_by_rank.setdefault(CARD_RANK[starter], []).append(starter)
+
+    summaries: dict[int, List[tuple[int, int, int | None, int | None]]] = {}
+    for starter_rank, rank_starters in starters_by_rank.items():
+        counts = list(rank_counts)
+        counts[starter_rank] -= 1
+
+        groups = _opponent_rank_groups(counts)
+        group_index = {(r1, r2): i for i, (r1, r2, _) in enumerate(groups)}
+        group_pairs = [pairs for _, _, pairs in groups]
+        num_cribs = sum(group_pairs)
+        group_offsets = [r1 * num_ranks + r2 for r1, r2, _ in groups]
+
+        # Core points per group for each discard, plus group order by core points.
+        cores_by_discard = []
+        for ranks in discard_ranks:
+            cores = _group_cores([*ranks, starter_rank], groups, group_offsets)
+            core_sum = sum(map(mul, group_pairs, cores))
+            cores_by_discard.append((cores, core_sum, sorted(range(len(groups)), key=cores.__getitem__)))
+
+        for starter in rank_starters:
+            starter_suit = CARD_SUIT[starter]
+            opponent_bits = available_bits & ~CARD_BIT[starter]
+            in_suit = [bool(opponent_bits & CARD_BIT[r * 4 + starter_suit]) for r in range(num_ranks)]
+            knob_card = JACK * 4 + starter_suit
+
+            # Pairs holding the knob jack, by group.
+            knob_groups: dict[int, int] = {}
+            if opponent_bits & CARD_BIT[knob_card]:
+                for r in range(num_ranks):
+                    i = group_index.get((min(r, JACK), max(r, JACK)))
+                    knob = counts[JACK] - 1 if r == JACK else counts[r]
+                    if i is not None and knob:
+                        knob_groups[i] = knob
+
+            # Groups whose one same-suit card pair is in the starter's suit.
+            flush_groups = [i for i, (r1, r2, _) in enumerate(groups) if r1 != r2 and in_suit[r1] and in_suit[r2]]
+
+            results = []
+            for discard, discard_suit, (cores, core_sum, by_core) in zip(discards, discard_suits, cores_by_discard):
+                knob_bonus = 1 if knob_card in discard else 0
+                special = {i: [0, knob] for i, knob in knob_groups.items()}
+                if discard_suit == starter_suit:
+                    for i in flush_groups:
+                        special.setdefault(i, [0, 0])[0] = 1
+
+                score_sum = core_sum + knob_bonus * num_cribs
+                lo = hi = None
+                for i, (flush, knob) in special.items():
+                    pairs = groups[i][2]
+                    core = cores[i]
+                    # Knob groups contain a jack, so their flush pair holds the knob jack.
+                    both = flush if knob else 0
+                    flush_only = flush - both
+                    knob_only = knob - both
+                    plain = pairs - flush - knob + both
+                    score_sum += knob_only * (1 - knob_bonus) + flush_only * 5 + both * (6 - knob_bonus)
+
+                    # Bonuses in increasing order: plain <= knob only < flush only <= both.
+                    if plain:
+                        group_lo = core + knob_bonus
+                    elif knob_only:
+                        group_lo = core + 1
+                    elif flush_only:
+                        group_lo = core + 5 + knob_bonus
+                    else:
+                        group_lo = core + 6
+
+                    if both:
+                        group_hi = core + 6
+                    elif flush_only:
+                        group_hi = core + 5 + knob_bonus
+                    elif knob_only:
+                        group_hi = core + 1
+                    else:
+                        group_hi = core + knob_bonus
+
+                    if lo is None or group_lo < lo:
+                        lo = group_lo
+                    if hi is None or group_hi > hi:
+                        hi = group_hi
+
+                # Every other group scores its core points plus the knob bonus.
+                for i in by_core:
+                    if i not in special:
+                        if lo is None or cores[i] + knob_bonus < lo:
+                            lo = cores[i] + knob_bonus
+                        break
+                for i in reversed(by_core):
+                    if i not in special:
+                        if hi is None or cores[i] + knob_bonus > hi:
+                            hi = cores[i] + knob_bonus
+                        break
+
+                results.append((score_sum, num_cribs, lo, hi))
+            summaries[starter] = results
+
+    return [summaries[starter] for starter in starters]
+
+
+def _crib_score_sums(discards: List[List[int]], available: List[int]) -> List[tuple[int, int]]:
+    """
+    Exact (score_sum, num_cribs) over every crib for each discard.
 
+    Gives the same totals as summing `_crib_rank_class_summaries`, without
+    per-starter detail or min/max: starters are weighted by how many cards of
+    their rank are available, and flush and knobs are counted in closed form.
+    """
+    num_ranks = len(RANK_ORDER)
+    rank_counts = [0] * num_ranks
+    suit_counts = [0] * len(SUIT_ORDER)
+    for c in available:
+        rank_counts[CARD_RANK[c]] += 1
+        suit_counts[CARD_SUIT[c]] += 1
+    discard_ranks = [[CARD_RANK[c] for c in discard] for discard in discards]
+
+    sums = [0] * len(discards)
+    for starter_rank, weight in enumerate(rank_counts):
+        if not weight:
+            continue
+        counts = list(rank_counts)
+        counts[starter_rank] -= 1
+        groups = _opponent_rank_groups(counts)
+        group_pairs = [pairs for _, _, pairs in groups]
+        group_offsets = [r1 * num_ranks + r2 for r1, r2, _ in groups]
+        for i, ranks in enumerate(discard_ranks):
+            cores = _group_cores([*ranks, starter_rank], groups, group_offsets)
+            sums[i] += weight * sum(map(mul, group_pairs, cores))
+
+    n = len(available)
+    pairs_per_starter = (n - 1) * (n - 2) // 2
+    available_bits = hand_mask(available)
+    for i, discard in enumerate(discards):
+        # Flush: starter and both opponent cards in the discard's suit.
+        suit = CARD_SUIT[discard[0]]
+        if CARD_SUIT[discard[1]] == suit:
+            m = suit_counts[suit]
+            sums[i] += 5 * m * (m - 1) * (m - 2) // 2
+        # Knobs: the jack of the starter's suit is in the discard (every
+        # opponent pair) or held by the opponent (n - 2 pairs include it).
+        for starter in available:
+            knob_card = JACK * 4 + CARD_SUIT[starter]
+            if knob_card in discard:
+                sums[i] += pairs_per_starter
+            elif knob_card != starter and available_bits & CARD_BIT[knob_card]:
+                sums[i] += n - 2
+
+    return [(score_sum, n * pairs_per_starter) for score_sum in sums]
+
+
+# Sampled crib estimates: z for a 95% normal confidence interval, and how many
+# samples are drawn between time-budget checks.
+CONFIDENCE_Z = 1.96
+SAMPLE_BATCH = 32
+
+
+def _sample_crib_stats(
+    discards: List[List[int]],
+    available: List[int],
+    samples: int | None,
+    time_budget_ms: float | None,
+    seed: int | None,
+) -> List[dict]:
+    """
+    Estimate crib stats for each discard from random (starter, opponent
+    discard) pairs instead of enumerating all of them.
+
+    Every pair is equally likely, so starter and opponent cards are drawn as
+    3 distinct available cards. The same draws are shared by all discards,
+    which keeps comparisons between them steady. Sampling stops after
+    `samples` draws or once `time_budget_ms` has elapsed, whichever comes
+    first; the clock is checked every SAMPLE_BATCH draws.
+
+    Returns one dict per discard with the crib_outcome_stats keys (min/max
+    are the observed ones, by_starter is None) plus "exact" (False),
+    "samples", "std_error", "ci_low" and "ci_high".
+    """
+    rng = random.Random(seed)
+    deadline = None if time_budget_ms is None else time.perf_counter() + time_budget_ms / 1000
+    limit = samples if samples is not None else math.inf
+
+    sums = [0] * len(discards)
+    squares = [0] * len(discards)
+    lows = [math.inf] * len(discards)
+    highs = [-math.inf] * len(discards)
+    n = 0
+    if len(available) >= 3:
+        while n < limit:
+            for _ in range(min(SAMPLE_BATCH, limit - n)):
+                starter, a, b = rng.sample(available, 3)
+                for i, (d0, d1) in enumerate(discards):
+                    score = _score_ids((d0, d1, a, b, starter), is_crib=True)
+                    sums[i] += score
+                    squares[i] += score * score
+                    if score < lows[i]:
+                        lows[i] = score
+                    if score > highs[i]:
+                        highs[i] = score
+                n += 1
+            if deadline is not None and time.perf_counter() >= deadline:
+                break
+
+    results = []
+    for total, square, lo, hi in zip(sums, squares, lows, highs):
+        if n == 0:
+            results.append(
+                {
+                    "avg_score": 0.0,
+                    "min_score": 0.0,
+                    "max_score": 0.0,
+                    "by_starter": None,
+                    "exact": False,
+                    "samples": 0,
+                    "std_error": None,
+                    "ci_low": None,
+                    "ci_high": None,
+                }
+            )
+            continue
+        mean = total / n
+        # A single draw says nothing about the spread.
+        std_error = math.sqrt(max(square - n * mean * mean, 0.0) / (n - 1) / n) if n > 1 else None
+        results.append(
+            {
+                "avg_score": mean,
+                "min_score": lo,
+                "max_score": hi,
+                "by_starter": None,
+                "exact": False,
+                "samples": n,
+                "std_error": std_error,
+                "ci_low": mean - CONFIDENCE_Z * std_error if std_error is not None else None,
+                "ci_high": mean + CONFIDENCE_Z * std_error if std_error is not None else None,
+            }
+        )
+    return results
+
+
+def _crib_available_cards(
+    discard: List[int], deck: Iterable[str | int] | None, six_cards: Iterable[str | int] | None
+) -> List[int]:
+    """Cards left for starters and opponent discards, in deck order."""
+    # Build full deck and determine which cards are available for opponent discards
+    full_deck = FULL_DECK if deck is None else card_ids(deck)
+
+    # Cards that are definitely not available (the 6 dealt cards)
+    dealt_bits = hand_mask(discard)
+    if six_cards is not None:
+        dealt_bits |= hand_mask(card_ids(six_cards))
+
+    # Available cards for opponent discards and starters
+    return [c for c in full_deck if not dealt_bits & CARD_BIT[c]]
 
+
+@metrics.timed
 def crib_outcome_stats(
-    discard: Iterable[str],
+    discard: Iterable[str | int],
     *,
-    deck: Iterable[str] | None = None,
-    six_cards: Iterable[str] | None = None,
-) -> dict:
+    deck: Iterable[str | int] | None = None,
+    six_cards: Iterable[str | int] | None = None,
+    engine: str = "rank_class",
+    executor: Executor | None = None,
+    chunk_size: int = 12,
+    samples: int | None = None,
+    time_budget_ms: float | None = None,
+    seed: int | None = None,
+) -> Mapping:
     """
     Evaluate the expected crib score for 2 discarded cards.
 
@@ -413,82 +1247,351 @@ def crib_outcome_stats(
         six_cards:
             Optional iterable of the 6 cards that were dealt (to exclude from
             opponent's possible discards). If omitted, only excludes the discard cards.
+        engine:
+            "rank_class" (default) groups opponent discards by rank and adds
+            flush and knobs analytically (see `_crib_rank_class_summaries`).
+            "python" scores each crib in turn; "numpy" scores the whole
+            starter × opponent-discard grid with one `score_hands_batch` call.
+            All engines give identical results.
+        executor:
+            Optional executor (e.g. `pool.get_executor()`) that evaluates
+            slices of `chunk_size` starters in parallel with the rank_class
+            engine. Results are identical to the serial path.
+        samples, time_budget_ms, seed:
+            If either of samples or time_budget_ms is given, estimate the
+            stats from random cribs instead (see `_sample_crib_stats`);
+            `seed` makes the draws reproducible. The engine is ignored.
 
     Returns:
-        A dict with:
+        A CribStats, a read-only mapping with (`to_dict()` for a plain dict):
             - "avg_score": average crib score over all possible starters and opponent discards
             - "min_score", "max_score"
             - "by_starter": {starter_card: average_score_for_that_starter}
+        Estimates are plain dicts with by_starter None that add "exact", "samples",
+        "std_error", "ci_low" and "ci_high".
     """
-    discard = list(discard)
+    discard = card_ids(discard)
     if len(discard) != 2:
         raise ValueError("crib_outcome_stats expects exactly 2 cards in discard")
 
-    # Build full deck and determine which cards are available for opponent discards
-    if deck is None:
-        ranks = RANK_ORDER
-        suits = "CDHS"
-        full_deck = [f"{r}{s}" for r in ranks for s in suits]
-    else:
-        full_deck = [c.strip().upper() for c in deck]
+    available = _crib_available_cards(discard, deck, six_cards)
 
-    discard_set = {c.strip().upper() for c in discard}
-    
-    # Cards that are definitely not available (the 6 dealt cards)
-    if six_cards is not None:
-        dealt_set = {c.strip().upper() for c in six_cards}
+    if samples is not None or time_budget_ms is not None:
+        return _sample_crib_stats([discard], available, samples, time_budget_ms, seed)[0]
+    if deck is None and engine == "rank_class":
+        # Equivalent discards share one cached result in canonical suits.
+        (canonical_discard, canonical_dealt), perm = canonicalize(
+            discard, card_ids(six_cards) if six_cards is not None else ()
+        )
+        key = f"{_cache_key(canonical_discard)}|{_cache_key(canonical_dealt)}"
+        stats = cache.get("crib", key, CribStats.from_dict)
+        if stats is None:
+            canonical_available = _crib_available_cards(list(canonical_discard), None, canonical_dealt)
+            summaries = _map_starter_slices(
+                _crib_rank_class_summaries,
+                ([list(canonical_discard)], canonical_available),
+                canonical_available,
+                executor,
+                chunk_size,
+            )
+            stats = CribStats.from_summaries(canonical_available, [per_discard[0] for per_discard in summaries])
+            cache.put("crib", key, stats, CribStats.to_dict)
+        return _relabel_stats(stats, inverse_permutation(perm))
+    if engine == "rank_class":
+        summaries = _map_starter_slices(
+            _crib_rank_class_summaries, ([discard], available), available, executor, chunk_size
+        )
+        return CribStats.from_summaries(available, [per_discard[0] for per_discard in summaries])
+    elif engine == "python":
+        scores_by_starter = (_crib_scores_for_starter(discard, available, starter) for starter in available)
+    elif engine == "numpy":
+        grid = _crib_grid(discard, available)
+        scores_by_starter = score_hands_batch(grid, is_crib=True).reshape(len(available), -1).tolist()
     else:
-        dealt_set = discard_set
-    
-    # Available cards for opponent discards and starters
-    available = [c for c in full_deck if c not in dealt_set]
-    
-    by_starter: dict[str, float] = {}
-    all_scores: List[int] = []
-
-    # For each possible starter, evaluate all possible opponent discards
-    for starter in available:
-        # Remaining cards after removing starter (for opponent's 2 discards)
-        remaining_for_opponent = [c for c in available if c != starter]
-        
-        starter_scores: List[int] = []
-        
-        # Evaluate all possible pairs of opponent discards
-        for opp_discard1, opp_discard2 in combinations(remaining_for_opponent, 2):
-            # Full crib: 2 your discards + 2 opponent discards + starter = 5 cards
-            crib_cards = [*discard, opp_discard1, opp_discard2, starter]
-            crib_score = score_hand(crib_cards, is_crib=True)
-            starter_scores.append(crib_score)
-        
-        # Average score for this starter over all opponent discard combinations
-        if starter_scores:
-            avg_for_starter = sum(starter_scores) / len(starter_scores)
-            by_starter[starter] = avg_for_starter
-            all_scores.extend(starter_scores)
-        else:
-            by_starter[starter] = 0.0
+        raise ValueError(f"Unknown engine {engine!r}")
 
-    if all_scores:
-        avg_score = sum(all_scores) / len(all_scores)
-        min_score = min(all_scores)
-        max_score = max(all_scores)
-    else:
-        avg_score = min_score = max_score = 0.0
+    return CribStats.from_scores(available, scores_by_starter)
 
+
+def iter_crib_outcome_stats(
+    discard: Iterable[str | int],
+    *,
+    deck: Iterable[str | int] | None = None,
+    six_cards: Iterable[str | int] | None = None,
+) -> Iterator[dict]:
+    """
+    Like `crib_outcome_stats`, but yields one update per starter as soon as
+    that starter is evaluated.
+
+    Each update is a dict with:
+        - "starter": the starter card code
+        - "starter_avg": average crib score for that starter
+        - "done", "total": starters evaluated so far, out of all starters
+        - "avg_score", "min_score", "max_score": running stats over the
+          starters so far; after the last update they equal
+          crib_outcome_stats' result
+
+    Work happens lazily between updates, so closing the generator (e.g. when
+    a streaming client disconnects) stops the computation.
+    """
+    discard = card_ids(discard)
+    if len(discard) != 2:
+        raise ValueError("crib_outcome_stats expects exactly 2 cards in discard")
+    available = _crib_available_cards(discard, deck, six_cards)
+
+    total_sum = total_count = 0
+    min_score = max_score = None
+    for done, starter in enumerate(available, start=1):
+        ((score_sum, num_cribs, lo, hi),) = _crib_rank_class_summaries([discard], available, [starter])[0]
+        if num_cribs:
+            total_sum += score_sum
+            total_count += num_cribs
+            if min_score is None or lo < min_score:
+                min_score = lo
+            if max_score is None or hi > max_score:
+                max_score = hi
+        yield {
+            "starter": CARD_CODES[starter],
+            "starter_avg": score_sum / num_cribs if num_cribs else 0.0,
+            "done": done,
+            "total": len(available),
+            "avg_score": total_sum / total_count if total_count else 0.0,
+            "min_score": min_score if total_count else 0.0,
+            "max_score": max_score if total_count else 0.0,
+        }
+
+
+def _map_starter_slices(
+    fn, args: tuple, starters: List[int], executor: Executor | None, chunk_size: int
+) -> list:
+    """
+    Call fn(*args, starters) and return its per-starter list of results.
+
+    With an executor the starters are split into slices of `chunk_size`,
+    evaluated in parallel, and concatenated back in order, so the result is
+    identical to the serial call.
+    """
+    if executor is None or len(starters) <= chunk_size:
+        return fn(*args, starters)
+    futures = [
+        executor.submit(fn, *args, starters[i : i + chunk_size]) for i in range(0, len(starters), chunk_size)
+    ]
+    results = []
+    for future in futures:
+        results.extend(future.result())
+    return results
+
+
+def _encode_evaluations(evaluations: dict[tuple[int, ...], tuple[StarterStats, CribStats | None]]) -> list:
+    """JSON-compatible form of keep evaluations for the result cache."""
+    return [
+        [list(keep), stats.to_dict(), crib_stats.to_dict() if crib_stats is not None else None]
+        for keep, (stats, crib_stats) in evaluations.items()
+    ]
+
+
+def _decode_evaluations(rows: list) -> dict[tuple[int, ...], tuple[StarterStats, CribStats | None]]:
+    """Inverse of `_encode_evaluations`."""
     return {
-        "avg_score": avg_score,
-        "min_score": min_score,
-        "max_score": max_score,
-        "by_starter": by_starter,
+        tuple(keep): (
+            StarterStats.from_dict(stats),
+            CribStats.from_dict(crib_stats) if crib_stats is not None else None,
+        )
+        for keep, stats, crib_stats in rows
     }
 
 
+def _evaluate_canonical_keeps(
+    canonical_deal: tuple[int, ...],
+    is_crib: bool,
+    include_crib: bool,
+    executor: Executor | None = None,
+    chunk_size: int = 12,
+) -> dict[tuple[int, ...], tuple[StarterStats, CribStats | None]]:
+    """
+    Stats for all 15 keeps of a canonical deal, keyed by sorted keep.
+
+    All distinct keeps are evaluated together by `_split_partials`. Keeps
+    that a suit permutation fixing the deal maps onto each other are
+    evaluated once; the others reuse that result with relabeled starters.
+    Results are cached (see cache.py), so they must be treated as read-only.
+    """
+    key = f"{_cache_key(canonical_deal)}|{int(is_crib)}|{int(include_crib)}"
+    evaluations = cache.get("keeps", key, _decode_evaluations)
+    if evaluations is not None:
+        return evaluations
+
+    dealt_bits = hand_mask(canonical_deal)
+    remaining_deck = [c for c in FULL_DECK if not dealt_bits & CARD_BIT[c]]
+    stabilizer = [
+        perm for perm in range(len(SUIT_PERMUTATIONS))
+        if tuple(sorted(relabel(canonical_deal, perm))) == canonical_deal
+    ]
+
+    # Pick one representative per class of equivalent keeps.
+    representative_of: dict[tuple[int, ...], tuple[tuple[int, ...], int]] = {}
+    representatives: List[tuple[int, ...]] = []
+    for keep in combinations(canonical_deal, 4):
+        representative, to_representative = min(
+            (tuple(sorted(relabel(keep, perm))), perm) for perm in stabilizer
+        )
+        representative_of[keep] = (representative, to_representative)
+        if representative == keep:
+            representatives.append(keep)
+
+    rows = _map_starter_slices(
+        _split_partials,
+        (canonical_deal, representatives, is_crib, include_crib),
+        remaining_deck,
+        executor,
+        chunk_size,
+    )
+
+    evaluations: dict[tuple[int, ...], tuple[StarterStats, CribStats | None]] = {}
+    for k, keep in enumerate(representatives):
+        stats = StarterStats.from_totals(
+            _score_ids(keep, is_crib), remaining_deck, [hand_totals[k] for hand_totals, _ in rows]
+        )
+        if include_crib:
+            crib_stats = CribStats.from_summaries(remaining_deck, [crib[k] for _, crib in rows])
+        else:
+            crib_stats = None
+        evaluations[keep] = (stats, crib_stats)
+
+    # The other keeps reuse their representative's results with relabeled starters.
+    for keep, (representative, to_representative) in representative_of.items():
+        if keep not in evaluations:
+            stats, crib_stats = evaluations[representative]
+            back = inverse_permutation(to_representative)
+            evaluations[keep] = (_relabel_stats(stats, back), _relabel_stats(crib_stats, back))
+
+    cache.put("keeps", key, evaluations, _encode_evaluations)
+    return evaluations
+
+
+def _split_partials(
+    deal: Sequence[int],
+    keeps: List[tuple[int, ...]],
+    is_crib: bool,
+    include_crib: bool,
+    starters: List[int],
+) -> List[tuple[List[int], List[tuple[int, int, int | None, int | None]] | None]]:
+    """
+    Per-starter partial results for several keep/discard splits of one deal.
+
+    The candidate starters and the opponent's available cards are built once
+    for the deal and every split is evaluated in the same pass over
+    `starters`. Returns one (hand_totals, crib_summaries) row per starter,
+    each holding one value per keep: the 5-card hand total, and the crib
+    (score_sum, num_cribs, min_score, max_score) for the matching discard
+    (crib_summaries is None when include_crib is False).
+    """
+    hand_totals = [[_score_ids([*keep, starter], is_crib) for keep in keeps] for starter in starters]
+    if not include_crib:
+        return [(totals, None) for totals in hand_totals]
+
+    dealt_bits = hand_mask(deal)
+    available = [c for c in FULL_DECK if not dealt_bits & CARD_BIT[c]]
+    discards = [[c for c in deal if c not in keep] for keep in keeps]
+    return list(zip(hand_totals, _crib_rank_class_summaries(discards, available, starters)))
+
+
+def _evaluate_canonical_keeps_pruned(
+    canonical_deal: tuple[int, ...],
+    is_crib: bool,
+    my_crib: bool,
+    executor: Executor | None = None,
+    chunk_size: int = 12,
+) -> dict[tuple[int, ...], tuple[StarterStats, CribStats]]:
+    """
+    Like `_evaluate_canonical_keeps` with crib, but only fully evaluates the
+    crib of keeps that can still be best.
+
+    Hand stats for all keeps are cheap. Each keep's combined value is then
+    bounded using `_crib_score_sums`; since that sum is exact, the lower and
+    upper bounds coincide and every keep strictly below the best is pruned.
+    Only the keeps tied for best get full crib stats (min, max, by_starter),
+    which is all the tie-break and the result need. Pruned keeps report
+    their exact avg_score with min_score, max_score and by_starter None.
+    Results are cached like `_evaluate_canonical_keeps`.
+    """
+    key = f"{_cache_key(canonical_deal)}|{int(is_crib)}|{int(my_crib)}"
+    evaluations = cache.get("keeps_pruned", key, _decode_evaluations)
+    if evaluations is not None:
+        return evaluations
+
+    hand_evaluations = _evaluate_canonical_keeps(canonical_deal, is_crib, False)
+    dealt_bits = hand_mask(canonical_deal)
+    remaining_deck = [c for c in FULL_DECK if not dealt_bits & CARD_BIT[c]]
+
+    keeps = list(combinations(canonical_deal, 4))
+    discards = [[c for c in canonical_deal if c not in keep] for keep in keeps]
+    crib_avgs = [
+        score_sum / num_cribs if num_cribs else 0.0
+        for score_sum, num_cribs in _crib_score_sums(discards, remaining_deck)
+    ]
+    values = [
+        hand_evaluations[keep][0]["avg_total"] + (avg if my_crib else -avg) for keep, avg in zip(keeps, crib_avgs)
+    ]
+    best_value = max(values)
+    survivors = [i for i, value in enumerate(values) if value == best_value]
+
+    rows = _map_starter_slices(
+        _crib_rank_class_summaries,
+        ([discards[i] for i in survivors], remaining_deck),
+        remaining_deck,
+        executor,
+        chunk_size,
+    )
+    evaluations: dict[tuple[int, ...], tuple[StarterStats, CribStats]] = {}
+    for i, keep in enumerate(keeps):
+        evaluations[keep] = (
+            hand_evaluations[keep][0],
+            CribStats(crib_avgs[i], None, None),
+        )
+    for j, i in enumerate(survivors):
+        crib_stats = CribStats.from_summaries(remaining_deck, [row[j] for row in rows])
+        evaluations[keeps[i]] = (hand_evaluations[keeps[i]][0], crib_stats)
+    cache.put("keeps_pruned", key, evaluations, _encode_evaluations)
+    return evaluations
+
+
+def _evaluate_canonical_keeps_sampled(
+    canonical_deal: tuple[int, ...],
+    is_crib: bool,
+    samples: int | None,
+    time_budget_ms: float | None,
+    seed: int | None,
+) -> dict[tuple[int, ...], tuple[StarterStats, dict]]:
+    """
+    Exact hand stats with sampled crib estimates for every keep of a deal.
+
+    All 15 discards are scored on the same random cribs.
+    """
+    hand_evaluations = _evaluate_canonical_keeps(canonical_deal, is_crib, False)
+    dealt_bits = hand_mask(canonical_deal)
+    remaining_deck = [c for c in FULL_DECK if not dealt_bits & CARD_BIT[c]]
+
+    keeps = list(combinations(canonical_deal, 4))
+    discards = [[c for c in canonical_deal if c not in keep] for keep in keeps]
+    estimates = _sample_crib_stats(discards, remaining_deck, samples, time_budget_ms, seed)
+    return {keep: (hand_evaluations[keep][0], estimate) for keep, estimate in zip(keeps, estimates)}
+
+
+@metrics.timed
 def best_keep_from_six(
-    six_cards: Iterable[str],
+    six_cards: Iterable[str | int],
     *,
     is_crib: bool = False,
     my_crib: bool = True,
     include_crib: bool = True,
+    executor: Executor | None = None,
+    chunk_size: int = 12,
+    prune: bool = False,
+    samples: int | None = None,
+    time_budget_ms: float | None = None,
+    seed: int | None = None,
+    include_pegging: bool = False,
 ) -> dict:
     """
     Given 6 dealt cards, find the best 4‑card keep under expected scoring,
@@ -512,6 +1615,27 @@ def best_keep_from_six(
         include_crib:
             If `False`, skip crib evaluation and only compare hand values (much faster).
             Default `True` for full evaluation.
+        executor, chunk_size:
+            Optional executor (e.g. `pool.get_executor()`) that evaluates
+            slices of `chunk_size` starters for all keeps in parallel.
+            Results are identical to the serial path.
+        prune:
+            With include_crib, only compute full crib stats for keeps that
+            can still be best (see `_evaluate_canonical_keeps_pruned`). The
+            best keep, its stats and the tie-break are unchanged; in "keeps",
+            pruned entries have min_score/max_score None.
+        samples, time_budget_ms, seed:
+            With include_crib, estimate each keep's crib from random cribs
+            as in `crib_outcome_stats` (hand stats stay exact). The crib
+            stats then carry "samples", "std_error", "ci_low" and "ci_high",
+            and the best keep is only as reliable as those intervals.
+        include_pegging:
+            Also add each keep's expected net pegging in the play
+            (`pegging.keep_values`; the non-dealer, i.e. the player without
+            the crib, leads) to its combined value, reported as
+            "pegging_value" per keep and "best_pegging_value". Pruning is
+            not used then, as its bounds ignore the play, and an uncached
+            deal takes about 0.1-0.4 s longer.
 
     Returns:
         A dict like:
@@ -521,6 +1645,7 @@ def best_keep_from_six(
           "best_stats": { ... starter_outcome_stats for best keep ... },
           "best_crib_stats": { ... crib_outcome_stats for best discard ... },
           "combined_value": float,  # hand avg_total + (crib avg_score if my_crib, else -crib avg_score)
+                                    # (+ pegging value with include_pegging)
           "keeps": [
             {
               "keep": [...],
@@ -533,39 +1658,70 @@ def best_keep_from_six(
           ],
         }
     """
-    cards = [c.strip().upper() for c in six_cards]
+    cards = card_ids(six_cards)
     if len(cards) != 6:
         raise ValueError("best_keep_from_six expects exactly 6 cards")
+    if len(set(cards)) != 6:
+        raise ValueError("best_keep_from_six expects 6 distinct cards")
+
+    # Evaluate the suit-canonical deal (shared by every equivalent deal), then
+    # map each keep of this deal onto its canonical counterpart.
+    (canonical_deal,), perm = canonicalize(cards)
+    if include_crib and (samples is not None or time_budget_ms is not None):
+        evaluations = _evaluate_canonical_keeps_sampled(canonical_deal, is_crib, samples, time_budget_ms, seed)
+    elif prune and include_crib and not include_pegging:
+        evaluations = _evaluate_canonical_keeps_pruned(canonical_deal, is_crib, my_crib, executor, chunk_size)
+    else:
+        evaluations = _evaluate_canonical_keeps(canonical_deal, is_crib, include_crib, executor, chunk_size)
+    pegging_values = None
+    if include_pegging:
+        # The dealer owns the crib, so the other player leads the play.
+        pegging_values = pegging.keep_values([CARD_RANK[c] for c in cards], leads=not my_crib)
+    return _select_best_keep(cards, evaluations, perm, include_crib, my_crib, pegging_values)
+
+
+def _select_best_keep(
+    cards: List[int],
+    evaluations: dict[tuple[int, ...], tuple[StarterStats, Mapping | None]],
+    perm: int,
+    include_crib: bool,
+    my_crib: bool,
+    pegging_values: dict[tuple[int, ...], float] | None = None,
+) -> dict:
+    """
+    `best_keep_from_six`'s result for `cards` from the evaluations of its
+    canonical deal, where `perm` maps `cards` onto that deal, adding
+    `pegging_values` (by sorted keep ranks) to the combined values if given.
+    """
+    to_canonical = _RELABELED_CARD[perm]
+    from_canonical = inverse_permutation(perm)
 
-    # Build deck for possible starters: full 52 minus these 6 cards.
-    full_deck = [f"{r}{s}" for r in RANK_ORDER for s in "CDHS"]
-    remaining_deck = [c for c in full_deck if c not in set(cards)]
-
-    best_keep: List[str] | None = None
-    best_stats: dict | None = None
-    best_crib_stats: dict | None = None
+    best_keep: List[int] | None = None
+    best_stats: StarterStats | None = None
+    best_crib_stats: Mapping | None = None
     best_combined_value: float = float("-inf")
     keeps: List[dict] = []
 
     for keep_tuple in combinations(cards, 4):
         keep = list(keep_tuple)
         discard = [c for c in cards if c not in keep]
-        stats = starter_outcome_stats(keep, is_crib=is_crib, deck=remaining_deck)
+        stats, crib_stats = evaluations[tuple(sorted(to_canonical[c] for c in keep))]
         
         if include_crib:
-            crib_stats = crib_outcome_stats(discard, deck=remaining_deck, six_cards=cards)
             # Combined value: hand value + crib value (positive if my_crib, negative if opponent's)
             crib_contribution = crib_stats["avg_score"] if my_crib else -crib_stats["avg_score"]
             combined_value = stats["avg_total"] + crib_contribution
         else:
             # Skip crib evaluation - just use hand value
-            crib_stats = None
             combined_value = stats["avg_total"]
+        if pegging_values is not None:
+            pegging_value = pegging_values[tuple(sorted(CARD_RANK[c] for c in keep))]
+            combined_value += pegging_value
 
         keeps.append(
             {
-                "keep": keep,
-                "discard": discard,
+                "keep": card_codes(keep),
+                "discard": card_codes(discard),
                 "stats": {
                     "base_score": stats["base_score"],
                     "avg_total": stats["avg_total"],
@@ -581,6 +1737,8 @@ def best_keep_from_six(
                 "combined_value": combined_value,
             }
         )
+        if pegging_values is not None:
+            keeps[-1]["pegging_value"] = pegging_value
 
         # Choose best based on combined value
         if best_keep is None or combined_value > best_combined_value:
@@ -596,13 +1754,117 @@ def best_keep_from_six(
                 best_crib_stats = crib_stats
                 best_combined_value = combined_value
 
-    return {
-        "best_keep": best_keep,
-        "best_discard": [c for c in cards if best_keep and c not in best_keep],
-        "best_stats": best_stats,
-        "best_crib_stats": best_crib_stats,
+    result = {
+        "best_keep": card_codes(best_keep) if best_keep else best_keep,
+        "best_discard": card_codes(c for c in cards if best_keep and c not in best_keep),
+        "best_stats": _relabel_stats(best_stats, from_canonical),
+        "best_crib_stats": _relabel_stats(best_crib_stats, from_canonical),
         "combined_value": best_combined_value,
         "keeps": keeps,
     }
+    if pegging_values is not None and best_keep:
+        result["best_pegging_value"] = pegging_values[tuple(sorted(CARD_RANK[c] for c in best_keep))]
+    return result
+
+
+@metrics.timed
+def evaluate_deal(
+    six_cards: Iterable[str | int],
+    *,
+    is_crib: bool = False,
+    executor: Executor | None = None,
+    chunk_size: int = 12,
+) -> dict:
+    """
+    Everything the scoring endpoints need about a deal, from one evaluation.
+
+    Every keep is evaluated once with its crib (the same cached evaluation
+    `best_keep_from_six` and `analyze_hand` use), and the best keep is then
+    picked for both crib owners from it.
+
+    Returns:
+        {
+          "my_crib": best_keep_from_six(six_cards, my_crib=True) result,
+          "opponent_crib": best_keep_from_six(six_cards, my_crib=False) result,
+          "stats": {keep: starter_outcome_stats-style stats for that keep},
+          "crib_stats": {discard: crib_outcome_stats(discard, six_cards=six_cards)},
+        }
+    where keeps and discards are tuples of sorted card ids, and the stats
+    use the 46 starters that were not dealt.
+    """
+    cards = card_ids(six_cards)
+    if len(cards) != 6 or len(set(cards)) != 6:
+        raise ValueError("evaluate_deal expects 6 distinct cards")
+
+    (canonical_deal,), perm = canonicalize(cards)
+    evaluations = _evaluate_canonical_keeps(canonical_deal, is_crib, True, executor, chunk_size)
+    to_canonical = _RELABELED_CARD[perm]
+    from_canonical = inverse_permutation(perm)
+
+    stats = {}
+    crib_stats = {}
+    dealt = sorted(cards)
+    for keep in combinations(dealt, 4):
+        keep_stats, keep_crib_stats = evaluations[tuple(sorted(to_canonical[c] for c in keep))]
+        stats[keep] = _relabel_stats(keep_stats, from_canonical)
+        crib_stats[tuple(c for c in dealt if c not in keep)] = _relabel_stats(keep_crib_stats, from_canonical)
+    return {
+        "my_crib": _select_best_keep(cards, evaluations, perm, True, True),
+        "opponent_crib": _select_best_keep(cards, evaluations, perm, True, False),
+        "stats": stats,
+        "crib_stats": crib_stats,
+    }
+
+
+@metrics.timed
+def analyze_hand(
+    hand: Iterable[str | int],
+    six_cards: Iterable[str | int],
+    *,
+    is_crib: bool = False,
+    my_crib: bool = True,
+    include_crib: bool = True,
+    executor: Executor | None = None,
+    chunk_size: int = 12,
+) -> dict:
+    """
+    Everything about one keep from a deal, from a single shared evaluation.
 
+    `best_keep_from_six` evaluates every keep of the deal anyway, so the
+    chosen keep's stats and its discard's crib stats are read from that same
+    (cached) evaluation instead of being computed again. Like the keeps in
+    `best_keep_from_six`, the chosen keep's starters are the 46 cards not
+    dealt, so its stats compare directly with the best keep's.
 
+    Returns:
+        {
+          "stats": starter_outcome_stats-style dict for `hand`,
+          "crib_stats": crib_outcome_stats-style dict for the discard
+                        (None without include_crib),
+          "best": best_keep_from_six(...) result,
+        }
+    """
+    cards = card_ids(six_cards)
+    hand = card_ids(hand)
+    if len(hand) != 4 or len(set(hand)) != 4 or not set(hand) <= set(cards):
+        raise ValueError("analyze_hand expects 4 distinct cards from six_cards")
+
+    best = best_keep_from_six(
+        cards,
+        is_crib=is_crib,
+        my_crib=my_crib,
+        include_crib=include_crib,
+        executor=executor,
+        chunk_size=chunk_size,
+    )
+
+    # Same cache entry best_keep_from_six just used.
+    (canonical_deal,), perm = canonicalize(cards)
+    evaluations = _evaluate_canonical_keeps(canonical_deal, is_crib, include_crib, executor, chunk_size)
+    stats, crib_stats = evaluations[tuple(sorted(_RELABELED_CARD[perm][c] for c in hand))]
+    from_canonical = inverse_permutation(perm)
+    return {
+        "stats": _relabel_stats(stats, from_canonical),
+        "crib_stats": _relabel_stats(crib_stats, from_canonical),
+        "best": best,
+    }
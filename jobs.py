@@ -0,0 +1,163 @@
+"""
+Background jobs for slow analysis, with deduplication of identical work.
+
+A job is identified by a caller-chosen id that is derived from its inputs,
+so identical requests map to the same id. Submitting an id that is already
+queued or running returns the existing job instead of starting another, and
+every caller shares its future.
+
+Jobs run on a small thread pool per process, bounded both in threads and in
+how many jobs may wait. Finished jobs are kept for a while so clients can
+poll for the result, then dropped.
+
+Settings:
+    CRIBBDLE_JOB_WORKERS     threads running jobs (default 2)
+    CRIBBDLE_JOB_QUEUE_SIZE  unfinished jobs allowed at once (default 64)
+    CRIBBDLE_JOB_TTL         seconds a finished job is kept (default 600)
+"""
+
+from __future__ import annotations
+
+import atexit
+import contextvars
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable
+
+
+DEFAULT_WORKERS = 2
+DEFAULT_QUEUE_SIZE = 64
+DEFAULT_TTL = 600
+
+
+class JobQueueFull(RuntimeError):
+    """Raised when a new job would exceed CRIBBDLE_JOB_QUEUE_SIZE."""
+
+
+class Job:
+    """A submitted computation and the future holding its result."""
+
+    def __init__(self, job_id: str, future: Future) -> None:
+        self.id = job_id
+        self.future = future
+        self.finished_at: float | None = None
+
+    @property
+    def status(self) -> str:
+        """One of "pending", "running", "done" or "error"."""
+        if not self.future.done():
+            return "running" if self.future.running() else "pending"
+        if self.future.cancelled() or self.future.exception() is not None:
+            return "error"
+        return "done"
+
+    def to_dict(self) -> dict:
+        """Status for clients; adds "result" or "error" once finished."""
+        info: dict[str, Any] = {"job_id": self.id, "status": self.status}
+        if info["status"] == "done":
+            info["result"] = self.future.result()
+        elif info["status"] == "error":
+            info["error"] = "cancelled" if self.future.cancelled() else str(self.future.exception())
+        return info
+
+
+_executor: ThreadPoolExecutor | None = None
+_executor_pid: int | None = None
+_jobs: dict[str, Job] = {}
+_lock = threading.Lock()
+
+
+def worker_count() -> int:
+    """Configured number of job threads."""
+    return max(1, int(os.environ.get("CRIBBDLE_JOB_WORKERS", str(DEFAULT_WORKERS))))
+
+
+def queue_size() -> int:
+    """Configured number of unfinished jobs allowed at once."""
+    return int(os.environ.get("CRIBBDLE_JOB_QUEUE_SIZE", str(DEFAULT_QUEUE_SIZE)))
+
+
+def ttl() -> float:
+    """Configured seconds a finished job stays pollable."""
+    return float(os.environ.get("CRIBBDLE_JOB_TTL", str(DEFAULT_TTL)))
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    """This process's job threads; a pool inherited across fork is never reused."""
+    global _executor, _executor_pid
+
+    if _executor is None or _executor_pid != os.getpid():
+        _executor = ThreadPoolExecutor(max_workers=worker_count(), thread_name_prefix="cribbdle-job")
+        _executor_pid = os.getpid()
+        _jobs.clear()
+    return _executor
+
+
+def _expire(now: float) -> None:
+    """Drop finished jobs older than the TTL. Caller holds _lock."""
+    cutoff = now - ttl()
+    for job_id in [job_id for job_id, job in _jobs.items() if job.finished_at is not None and job.finished_at < cutoff]:
+        del _jobs[job_id]
+
+
+def _mark_finished(job: Job) -> None:
+    job.finished_at = time.monotonic()
+
+
+def submit(job_id: str, fn: Callable[..., Any], *args: Any) -> Job:
+    """
+    Start fn(*args) as job `job_id`, or return the job already using that id.
+
+    A finished job is returned as is until it expires, so its result is
+    reused too. Raises JobQueueFull if too many jobs are unfinished.
+    """
+    with _lock:
+        executor = _get_executor()
+        _expire(time.monotonic())
+        job = _jobs.get(job_id)
+        if job is not None:
+            return job
+        if sum(1 for job in _jobs.values() if job.finished_at is None) >= queue_size():
+            raise JobQueueFull("Too many analysis jobs in progress; try again shortly.")
+        # The job runs in a copy of the submitter's context (e.g. its request metrics).
+        job = Job(job_id, executor.submit(contextvars.copy_context().run, fn, *args))
+        _jobs[job_id] = job
+    job.future.add_done_callback(lambda _: _mark_finished(job))
+    return job
+
+
+def run(job_id: str, fn: Callable[..., Any], *args: Any) -> Any:
+    """
+    Return fn(*args), sharing the result with any identical job in flight.
+
+    Falls back to calling fn in the current thread when the queue is full.
+    """
+    try:
+        job = submit(job_id, fn, *args)
+    except JobQueueFull:
+        return fn(*args)
+    return job.future.result()
+
+
+def get(job_id: str) -> Job | None:
+    """The job with this id, or None if it is unknown or expired."""
+    with _lock:
+        if _executor_pid != os.getpid():
+            return None
+        _expire(time.monotonic())
+        return _jobs.get(job_id)
+
+
+def shutdown() -> None:
+    """Stop this process's job threads, dropping queued jobs."""
+    global _executor, _executor_pid
+
+    if _executor is not None and _executor_pid == os.getpid():
+        _executor.shutdown(wait=False, cancel_futures=True)
+    _executor = None
+    _executor_pid = None
+
+
+atexit.register(shutdown)
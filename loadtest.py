@@ -0,0 +1,410 @@
+"""
+Load generator for sizing gunicorn workers and timeouts.
+
+Replays a request log against the app and reports throughput, latency
+percentiles (p50/p95/p99) and error rates, overall and per endpoint. The
+app can be driven:
+
+    - in process, through `app.create_app()`'s test client (no server),
+    - over HTTP, at any base URL (e.g. a running container), or
+    - over localhost against a gunicorn started with the given arguments,
+      so worker configurations can be compared directly.
+
+A request log is a JSON-lines file with one request per line:
+
+    {"method": "POST", "path": "/api/score", "json": {"hand": [...], ...}}
+
+Consecutive entries with the same "session" value are replayed in order by
+one worker. In a session, an entry with "keep" (indices into the 6 dealt
+cards) plays the cards of the session's last /api/deal or /api/daily
+response: its "hand" becomes the kept cards, and its "six_cards" and
+"deal_id" (where it has them) are replaced by the dealt ones, so deal
+sessions are exercised. The entry's own cards are sent if the deal failed.
+
+`synth` writes a synthetic one made of player sessions, each a visit to the
+page making the requests the page makes: today's daily puzzle, then
+practice deals, each hand scored with a quick sampled crib estimate and an
+/api/analyze call (see SESSION).
+Recorded traffic converted to this format replays the same way. Requests
+are sent by --concurrency workers in a closed loop, cycling through the
+log, until --requests have been sent or --duration seconds have passed.
+
+    python loadtest.py synth --sessions 500 --output data/loadtest/log.jsonl
+    python loadtest.py run --log data/loadtest/log.jsonl --concurrency 8
+    python loadtest.py run --gunicorn "--workers 2 --timeout 120" --concurrency 8 --duration 60
+    python loadtest.py run --target http://localhost:5555 --requests 2000
+
+Any response with status 400 or above, and any request that fails or times
+out, counts as an error.
+"""
+
+from __future__ import annotations
+
+import argparse
+import itertools
+import json
+import os
+import random
+import shlex
+import socket
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Sequence
+
+from bench import percentile
+from gameplay import CARD_CODES
+
+
+# Chances in a synthetic session: that a dealt hand is scored, and that
+# another practice deal follows the last one.
+SESSION = {
+    "score": 0.9,
+    "redeal": 0.6,
+}
+# What the page asks /api/analyze for, and its crib estimate budget.
+ANALYZE_INCLUDE = ["distribution", "breakdown", "best", "crib"]
+CRIB_ESTIMATE_MS = 20
+DEFAULT_SESSIONS = 200
+DEFAULT_SEED = 0
+DEFAULT_CONCURRENCY = 4
+DEFAULT_TIMEOUT = 120.0
+STARTUP_TIMEOUT = 60.0
+
+
+def synthetic_log(sessions: int = DEFAULT_SESSIONS, seed: int = DEFAULT_SEED) -> List[dict]:
+    """A request log of `sessions` synthetic player sessions, seeded."""
+    rng = random.Random(seed)
+    log = []
+    for session in range(sessions):
+        path = "/api/daily"
+        while True:
+            log.append({"method": "GET", "path": path, "session": session})
+            if rng.random() < SESSION["score"]:
+                log.extend(_scoring_requests(rng, session))
+            if rng.random() >= SESSION["redeal"]:
+                break
+            path = "/api/deal"
+    return log
+
+
+def _scoring_requests(rng: random.Random, session: int) -> List[dict]:
+    """The requests the page makes to score a kept hand of the dealt cards."""
+    # Fallback cards, used if the session's deal fails.
+    six_cards = rng.sample(CARD_CODES, 6)
+    keep = sorted(rng.sample(range(6), 4))
+    hand = [six_cards[i] for i in keep]
+    return [
+        {
+            "method": "POST",
+            "path": "/api/score/crib",
+            "session": session,
+            "keep": keep,
+            "json": {"hand": hand, "six_cards": six_cards, "time_budget_ms": CRIB_ESTIMATE_MS},
+        },
+        {
+            "method": "POST",
+            "path": "/api/analyze",
+            "session": session,
+            "keep": keep,
+            "json": {
+                "hand": hand,
+                "six_cards": six_cards,
+                "deal_id": None,
+                "is_crib": False,
+                "my_crib": True,
+                "include": ANALYZE_INCLUDE,
+            },
+        },
+    ]
+
+
+def _units(log: List[dict]) -> List[List[dict]]:
+    """The log split into what one worker replays in order: sessions, or single requests."""
+    units: List[List[dict]] = []
+    for entry in log:
+        session = entry.get("session")
+        if session is not None and units and units[-1][0].get("session") == session:
+            units[-1].append(entry)
+        else:
+            units.append([entry])
+    return units
+
+
+def _with_deal(entry: dict, deal: dict | None) -> dict:
+    """`entry` playing the cards of `deal` (an /api/deal or /api/daily response), if it has "keep"."""
+    keep = entry.get("keep")
+    cards = deal.get("cards") if deal else None
+    if keep is None or not cards:
+        return entry
+    body = dict(entry.get("json") or {})
+    body["hand"] = [cards[i] for i in keep]
+    if "six_cards" in body:
+        body["six_cards"] = cards
+    if "deal_id" in body:
+        body["deal_id"] = deal.get("deal_id")
+    return {**entry, "json": body}
+
+
+def load_log(path: str) -> List[dict]:
+    """Read a JSON-lines request log."""
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def write_log(log: List[dict], path: str) -> None:
+    """Write a JSON-lines request log."""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "w") as f:
+        for entry in log:
+            f.write(json.dumps(entry) + "\n")
+
+
+class InProcessClient:
+    """Sends requests to `app.create_app()` through Flask test clients, one per thread."""
+
+    def __init__(self) -> None:
+        # Importing the module builds the app with create_app(); it is only
+        # needed (and its background threads started) for in-process runs.
+        from app import app
+
+        self.app = app
+        self._local = threading.local()
+
+    def send(self, entry: dict) -> tuple[int, bytes]:
+        client = getattr(self._local, "client", None)
+        if client is None:
+            client = self._local.client = self.app.test_client()
+        response = client.open(entry["path"], method=entry.get("method", "GET"), json=entry.get("json"))
+        body = response.get_data()
+        response.close()
+        return response.status_code, body
+
+
+class HttpClient:
+    """Sends requests to a server at `base_url`."""
+
+    def __init__(self, base_url: str, timeout: float = DEFAULT_TIMEOUT) -> None:
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+
+    def send(self, entry: dict) -> tuple[int, bytes]:
+        body = json.dumps(entry["json"]).encode() if entry.get("json") is not None else None
+        req = urllib.request.Request(
+            self.base_url + entry["path"],
+            data=body,
+            method=entry.get("method", "GET"),
+            headers={"Content-Type": "application/json"} if body is not None else {},
+        )
+        try:
+            with urllib.request.urlopen(req, timeout=self.timeout) as response:
+                return response.status, response.read()
+        except urllib.error.HTTPError as exc:
+            return exc.code, exc.read()
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_gunicorn(args: str, port: int | None = None) -> tuple[subprocess.Popen, str]:
+    """
+    Start `gunicorn <args> app:app` on a free localhost port.
+
+    Returns the process and its base URL once it answers requests.
+    """
+    port = port or _free_port()
+    command = [sys.executable, "-m", "gunicorn", "--bind", f"127.0.0.1:{port}", *shlex.split(args), "app:app"]
+    process = subprocess.Popen(command, cwd=os.path.dirname(os.path.abspath(__file__)))
+    base_url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + STARTUP_TIMEOUT
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"gunicorn exited with status {process.returncode}")
+        try:
+            with urllib.request.urlopen(base_url + "/", timeout=1):
+                return process, base_url
+        except OSError:
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError(f"gunicorn did not answer within {STARTUP_TIMEOUT:.0f}s")
+
+
+def run_load(
+    client,
+    log: List[dict],
+    *,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    requests: int | None = None,
+    duration: float | None = None,
+) -> tuple[List[tuple[str, int | None, float]], float]:
+    """
+    Replay `log` with `concurrency` workers until `requests` are sent or
+    `duration` seconds pass (one pass over the log if neither is given).
+
+    Returns one (path, status or None on failure, seconds) per request and
+    the wall-clock time taken.
+    """
+    if requests is None and duration is None:
+        requests = len(log)
+    units = _units(log)
+    unit_counter = itertools.count()
+    counter = itertools.count()
+    results: List[tuple[str, int | None, float]] = []
+    results_lock = threading.Lock()
+    start = time.perf_counter()
+    deadline = start + duration if duration is not None else None
+
+    def worker() -> None:
+        while True:
+            deal = None
+            for entry in units[next(unit_counter) % len(units)]:
+                if requests is not None and next(counter) >= requests:
+                    return
+                if deadline is not None and time.perf_counter() >= deadline:
+                    return
+                entry = _with_deal(entry, deal)
+                sent = time.perf_counter()
+                try:
+                    status, body = client.send(entry)
+                except Exception:
+                    status, body = None, b""
+                took = time.perf_counter() - sent
+                with results_lock:
+                    results.append((entry["path"], status, took))
+                if entry["path"].startswith(("/api/deal", "/api/daily")):
+                    try:
+                        deal = json.loads(body) if status == 200 else None
+                    except ValueError:
+                        deal = None
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for future in [executor.submit(worker) for _ in range(concurrency)]:
+            future.result()
+    return results, time.perf_counter() - start
+
+
+def _summary(results: List[tuple[str, int | None, float]], elapsed: float) -> dict:
+    latencies = sorted(took for _, _, took in results)
+    errors = sum(1 for _, status, _ in results if status is None or status >= 400)
+    statuses: dict[str, int] = {}
+    for _, status, _ in results:
+        key = str(status) if status is not None else "failed"
+        statuses[key] = statuses.get(key, 0) + 1
+    summary = {
+        "requests": len(results),
+        "throughput": len(results) / elapsed if elapsed else 0.0,
+        "errors": errors,
+        "error_rate": errors / len(results) if results else 0.0,
+        "statuses": statuses,
+    }
+    if latencies:
+        summary.update(
+            {
+                "p50_ms": 1000 * percentile(latencies, 0.50),
+                "p95_ms": 1000 * percentile(latencies, 0.95),
+                "p99_ms": 1000 * percentile(latencies, 0.99),
+                "max_ms": 1000 * latencies[-1],
+            }
+        )
+    return summary
+
+
+def report(results: List[tuple[str, int | None, float]], elapsed: float) -> dict:
+    """
+    Throughput, latency percentiles and error rates, overall and per path.
+
+    {"seconds", "overall": summary, "by_path": {path: summary}}, where a
+    summary has requests, throughput (per second of the whole run), errors,
+    error_rate, statuses and p50_ms, p95_ms, p99_ms, max_ms.
+    """
+    by_path: dict[str, list] = {}
+    for result in results:
+        by_path.setdefault(result[0], []).append(result)
+    return {
+        "seconds": elapsed,
+        "overall": _summary(results, elapsed),
+        "by_path": {path: _summary(path_results, elapsed) for path, path_results in sorted(by_path.items())},
+    }
+
+
+def print_report(result: dict) -> None:
+    rows = [("overall", result["overall"]), *result["by_path"].items()]
+    print(f"{'':24} {'requests':>9} {'req/s':>9} {'errors':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for name, summary in rows:
+        print(
+            f"{name:24} {summary['requests']:9d} {summary['throughput']:9.1f} {summary['error_rate']:7.1%} "
+            f"{summary.get('p50_ms', 0):9.1f} {summary.get('p95_ms', 0):9.1f} {summary.get('p99_ms', 0):9.1f}"
+        )
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Load-test the app with replayed or synthetic traffic.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    synth_parser = sub.add_parser("synth", help="write a synthetic request log")
+    synth_parser.add_argument("--sessions", type=int, default=DEFAULT_SESSIONS, help="player sessions to generate")
+    synth_parser.add_argument("--seed", type=int, default=DEFAULT_SEED, help="random seed")
+    synth_parser.add_argument("--output", required=True, help="JSON-lines file to write")
+    run_parser = sub.add_parser("run", help="replay a request log and report latencies")
+    run_parser.add_argument("--log", default=None, help="JSON-lines request log (default: synthetic)")
+    run_parser.add_argument("--sessions", type=int, default=DEFAULT_SESSIONS, help="sessions of the synthetic log")
+    run_parser.add_argument("--seed", type=int, default=DEFAULT_SEED, help="seed of the synthetic log")
+    target = run_parser.add_mutually_exclusive_group()
+    target.add_argument("--target", default=None, help="base URL of a running server (default: in process)")
+    target.add_argument("--gunicorn", default=None, help='start gunicorn with these arguments, e.g. "--workers 2"')
+    run_parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY, help="parallel clients")
+    run_parser.add_argument("--requests", type=int, default=None, help="stop after this many requests")
+    run_parser.add_argument("--duration", type=float, default=None, help="stop after this many seconds")
+    run_parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT, help="HTTP client timeout (seconds)")
+    run_parser.add_argument("--output", default=None, help="also write the report as JSON here")
+
+    args = parser.parse_args(argv)
+    if args.command == "synth":
+        write_log(synthetic_log(args.sessions, args.seed), args.output)
+        return
+
+    log = load_log(args.log) if args.log else synthetic_log(args.sessions, args.seed)
+    process = None
+    try:
+        if args.gunicorn is not None:
+            process, base_url = start_gunicorn(args.gunicorn)
+            client = HttpClient(base_url, args.timeout)
+        elif args.target:
+            client = HttpClient(args.target, args.timeout)
+        else:
+            client = InProcessClient()
+        results, elapsed = run_load(
+            client, log, concurrency=args.concurrency, requests=args.requests, duration=args.duration
+        )
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+
+    result = report(results, elapsed)
+    result["config"] = {
+        "target": args.target or (f"gunicorn {args.gunicorn}" if args.gunicorn is not None else "in-process"),
+        "concurrency": args.concurrency,
+        "log": args.log or f"synthetic ({args.sessions} sessions, seed {args.seed})",
+        "log_requests": len(log),
+    }
+    print_report(result)
+    if args.output:
+        directory = os.path.dirname(args.output)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(args.output, "w") as f:
+            json.dump(result, f, indent=2)
+            f.write("\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+"""
+In-process metrics for the web app, in Prometheus text format.
+
+Two kinds of series are kept:
+
+    - latency histograms (seconds), for requests per endpoint and for calls
+      to the main gameplay functions and JSON serialization, and
+    - counters, for requests per endpoint, method and status.
+
+Gameplay functions are wrapped with `timed`; any other block can use
+`timer(name)`. While a request is being handled (`start_request` ...
+`end_request`), those timings are also summed per name for the request,
+which `server_timing` turns into a Server-Timing header. Work done for the
+request on another thread is included if that thread runs in a copy of the
+request's context (jobs.py does this).
+
+`render()` also reports the result cache counters from `cache.stats()`.
+Like the cache counters, everything is per process: with several gunicorn
+workers each one reports its own numbers.
+"""
+
+from __future__ import annotations
+
+import contextvars
+import functools
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator, List
+
+import cache
+
+
+# Histogram bucket upper bounds, in seconds.
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+REQUEST_DURATION = "cribbdle_request_duration_seconds"
+REQUESTS = "cribbdle_requests_total"
+FUNCTION_DURATION = "cribbdle_function_duration_seconds"
+
+_HELP = {
+    REQUEST_DURATION: ("histogram", "Time spent handling a request, by endpoint."),
+    REQUESTS: ("counter", "Requests handled, by endpoint, method and status."),
+    FUNCTION_DURATION: ("histogram", "Time spent in a gameplay function or in JSON serialization, by function."),
+}
+
+Labels = tuple[tuple[str, str], ...]
+
+# (name, labels) -> [count per bucket (last is +Inf), sum, count]
+_histograms: dict[tuple[str, Labels], list] = {}
+_counters: dict[tuple[str, Labels], float] = {}
+_lock = threading.Lock()
+
+# Per-request {name: [seconds, calls]}, or None outside a request.
+_request_timings: contextvars.ContextVar[dict[str, list] | None] = contextvars.ContextVar(
+    "cribbdle_request_timings", default=None
+)
+
+
+def observe(name: str, labels: Labels, seconds: float) -> None:
+    """Add one observation to histogram `name`."""
+    bucket = len(BUCKETS)
+    for i, bound in enumerate(BUCKETS):
+        if seconds <= bound:
+            bucket = i
+            break
+    with _lock:
+        series = _histograms.get((name, labels))
+        if series is None:
+            series = _histograms[(name, labels)] = [[0] * (len(BUCKETS) + 1), 0.0, 0]
+        series[0][bucket] += 1
+        series[1] += seconds
+        series[2] += 1
+
+
+def increment(name: str, labels: Labels, amount: float = 1) -> None:
+    """Add `amount` to counter `name`."""
+    with _lock:
+        _counters[(name, labels)] = _counters.get((name, labels), 0) + amount
+
+
+def _record(function: str, seconds: float) -> None:
+    observe(FUNCTION_DURATION, (("function", function),), seconds)
+    timings = _request_timings.get()
+    if timings is not None:
+        entry = timings.setdefault(function, [0.0, 0])
+        entry[0] += seconds
+        entry[1] += 1
+
+
+@contextmanager
+def timer(function: str) -> Iterator[None]:
+    """Time the block as a call of `function`."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        _record(function, time.perf_counter() - start)
+
+
+def timed(fn: Callable[..., Any]) -> Callable[..., Any]:
+    """Decorator timing every call of `fn` under its name."""
+    name = fn.__name__
+
+    @functools.wraps(fn)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        start = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            _record(name, time.perf_counter() - start)
+
+    return wrapper
+
+
+def start_request() -> contextvars.Token:
+    """Start collecting per-request timings in the current context."""
+    return _request_timings.set({})
+
+
+def end_request(token: contextvars.Token) -> None:
+    """Stop collecting per-request timings (pairs with `start_request`)."""
+    _request_timings.reset(token)
+
+
+def server_timing(total_seconds: float) -> str:
+    """
+    Server-Timing header value for the current request.
+
+    One entry per timed function with its summed duration (ms) and call
+    count, plus "total" for the whole request.
+    """
+    entries = []
+    for function, (seconds, calls) in (_request_timings.get() or {}).items():
+        entries.append(f'{function};dur={seconds * 1000:.3f};desc="{calls} call{"" if calls == 1 else "s"}"')
+    entries.append(f"total;dur={total_seconds * 1000:.3f}")
+    return ", ".join(entries)
+
+
+def _format_labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    escaped = (value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, value in labels)
+    return "{" + ",".join(f'{key}="{value}"' for (key, _), value in zip(labels, escaped)) + "}"
+
+
+def _format_value(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def render() -> str:
+    """Every metric in Prometheus text exposition format."""
+    with _lock:
+        histograms = {key: (list(series[0]), series[1], series[2]) for key, series in _histograms.items()}
+        counters = dict(_counters)
+
+    lines: List[str] = []
+    for name, (kind, help_text) in _HELP.items():
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        if kind == "histogram":
+            for (series_name, labels), (buckets, total, count) in sorted(histograms.items()):
+                if series_name != name:
+                    continue
+                cumulative = 0
+                for bound, bucket_count in zip((*BUCKETS, "+Inf"), buckets):
+                    cumulative += bucket_count
+                    lines.append(f"{name}_bucket{_format_labels((*labels, ('le', str(bound))))} {cumulative}")
+                lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(total)}")
+                lines.append(f"{name}_count{_format_labels(labels)} {count}")
+        else:
+            for (series_name, labels), value in sorted(counters.items()):
+                if series_name == name:
+                    lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+
+    cache_stats = cache.stats()
+    lines.append("# HELP cribbdle_cache_lookups_total Result cache lookups, by namespace and outcome.")
+    lines.append("# TYPE cribbdle_cache_lookups_total counter")
+    for namespace, counts in sorted(cache_stats.items()):
+        for outcome in ("memory_hits", "disk_hits", "misses"):
+            labels = (("namespace", namespace), ("outcome", outcome))
+            lines.append(f"cribbdle_cache_lookups_total{_format_labels(labels)} {counts[outcome]}")
+    lines.append("# HELP cribbdle_cache_hit_ratio Share of result cache lookups that hit either level, by namespace.")
+    lines.append("# TYPE cribbdle_cache_hit_ratio gauge")
+    for namespace, counts in sorted(cache_stats.items()):
+        lines.append(f"cribbdle_cache_hit_ratio{_format_labels((('namespace', namespace),))} {counts['hit_ratio']!r}")
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,304 @@
+"""
+Pegging (the play) for cribbage keeps.
+
+The play is scored the usual way: 2 for a fifteen or a 31, 2/6/12 for a
+pair, three or four of a kind, the length of a run of 3 or more among the
+latest cards of the count, and 1 for a go or the last card (a 31 already
+scores 2 and earns no extra point).
+
+`keep_values` estimates what each 4-card keep of a deal is worth in the
+play: the expected net pegging (our points minus the opponent's) against
+the hands the opponent can hold. Each pairing of hands is solved by a
+game-tree search in which both players see both hands and play their best,
+a "double dummy" simplification of the real game in which hands are hidden.
+
+Only ranks matter in the play, so everything here works on rank indices
+(0 = ace ... 12 = king, as in gameplay.RANK_ORDER). An uncached deal takes
+about 0.1-0.4 s, too slow for the request path, so nothing calls this while
+answering a request yet. The search is kept that fast by
+
+    - alpha-beta pruning, trying the moves that score most first, and
+      trying only one card of each rank in a hand,
+    - a transposition table of solved positions keyed by both players'
+      remaining ranks, the count and the part of the count that can still
+      score, shared by every search for one deal (each call has its own,
+      so concurrent calls never share one), and
+    - estimating the expectation from a fixed sample of opponent hands
+      (rank multisets drawn by how many 4-card hands produce them, seeded
+      by the deal so results are reproducible), the same for every keep so
+      keeps are compared on equal terms.
+
+Results are stored in the result cache (cache.py) per deal ranks.
+
+Settings:
+    CRIBBDLE_PEGGING_TABLE_SIZE  positions in a call's transposition table
+                                 (default 65536; cleared when full)
+"""
+
+from __future__ import annotations
+
+import os
+import random
+from bisect import bisect_right
+from functools import lru_cache
+from itertools import accumulate, combinations, combinations_with_replacement
+from math import comb
+from typing import Iterable, Sequence
+
+import cache
+import metrics
+
+
+NUM_RANKS = 13
+RANK_VALUE = (1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 10, 10, 10)
+MAX_COUNT = 31
+
+# Opponent hands sampled per deal.
+DEFAULT_SAMPLES = 32
+
+# Positions kept in the transposition table (see table_size).
+DEFAULT_TABLE_SIZE = 1 << 16
+
+_EXACT, _LOWER, _UPPER = 0, 1, 2
+
+
+def table_size() -> int:
+    """Configured number of positions in the transposition table."""
+    return int(os.environ.get("CRIBBDLE_PEGGING_TABLE_SIZE", str(DEFAULT_TABLE_SIZE)))
+
+
+def play_points(played: Sequence[int], count: int) -> int:
+    """
+    Points for the last card of `played`, the ranks of the current count in
+    play order, where `count` is the count including that card.
+    """
+    points = 2 if count == 15 or count == MAX_COUNT else 0
+
+    last = played[-1]
+    same = 1
+    for rank in reversed(played[:-1]):
+        if rank != last:
+            break
+        same += 1
+    if same > 1:
+        return points + (0, 0, 2, 6, 12)[same]
+
+    # The longest run ending with this card: the last n ranks, distinct and
+    # consecutive.
+    for n in range(len(played), 2, -1):
+        tail = played[-n:]
+        if max(tail) - min(tail) == n - 1 and len(set(tail)) == n:
+            return points + n
+    return points
+
+
+def _scoring_tail(played: tuple[int, ...]) -> tuple[int, ...]:
+    """
+    The part of the count that later cards can still score with: the
+    longest suffix of distinct ranks (for runs) or of equal ranks (for
+    pairs). Positions that differ only before it play out identically.
+    """
+    last = played[-1]
+    seen = {last}
+    distinct = 1
+    for rank in reversed(played[:-1]):
+        if rank in seen:
+            break
+        seen.add(rank)
+        distinct += 1
+    same = 1
+    for rank in reversed(played[:-1]):
+        if rank != last:
+            break
+        same += 1
+    return played[-max(distinct, same) :]
+
+
+@lru_cache(maxsize=1 << 16)
+def _play(played: tuple[int, ...], rank: int, count: int) -> tuple[int, tuple[int, ...]]:
+    """Points for playing `rank` onto a count, and the count's new scoring tail."""
+    now_played = played + (rank,)
+    return play_points(now_played, count), _scoring_tail(now_played)
+
+
+def _search(
+    mover: tuple[int, ...],
+    other: tuple[int, ...],
+    count: int,
+    played: tuple[int, ...],
+    mover_last: bool,
+    alpha: int,
+    beta: int,
+    table: dict[tuple, int],
+    limit: int,
+) -> int:
+    """
+    Net pegging (mover's points minus the other player's) from a position of
+    the play with both players playing their best, by alpha-beta search: a
+    result <= alpha or >= beta is only a bound.
+
+    `mover` and `other` are the sorted ranks left in each hand, `played`
+    the scoring tail of the count and `mover_last` whether the player to
+    move played its latest card. `table` maps solved positions to
+    value * 4 + bound kind and is cleared once it holds `limit` of them.
+    """
+    key = (mover, other, count, played, mover_last)
+    entry = table.get(key)
+    if entry is not None:
+        value, kind = entry >> 2, entry & 3
+        if kind == _EXACT or (kind == _LOWER and value >= beta) or (kind == _UPPER and value <= alpha):
+            return value
+    original_alpha = alpha
+
+    moves = []
+    previous = -1
+    for i, rank in enumerate(mover):
+        if rank == previous:
+            continue
+        previous = rank
+        new_count = count + RANK_VALUE[rank]
+        if new_count > MAX_COUNT:
+            break
+        points, tail = _play(played, rank, new_count)
+        moves.append((points, i, new_count, tail))
+
+    if moves:
+        moves.sort(reverse=True)
+        best = None
+        for points, i, new_count, tail in moves:
+            rest = mover[:i] + mover[i + 1 :]
+            # Follow the play to the next real decision, so positions where
+            # nobody has a choice are never searched or stored.
+            if new_count == MAX_COUNT:
+                # 31 starts a new count, led by the other player.
+                value = points - _search(other, rest, 0, (), False, points - beta, points - alpha, table, limit)
+            elif other and new_count + RANK_VALUE[other[0]] <= MAX_COUNT:
+                value = points - _search(
+                    other, rest, new_count, tail, False, points - beta, points - alpha, table, limit
+                )
+            elif rest and new_count + RANK_VALUE[rest[0]] <= MAX_COUNT:
+                # The other player says go and the mover plays on.
+                value = points + _search(
+                    rest, other, new_count, tail, True, alpha - points, beta - points, table, limit
+                )
+            elif rest or other:
+                # Neither can play: 1 for the go, and the other player leads
+                # the next count.
+                value = points + 1 - _search(
+                    other, rest, 0, (), False, points + 1 - beta, points + 1 - alpha, table, limit
+                )
+            else:
+                # Last card of the play.
+                value = points + 1
+            if best is None or value > best:
+                best = value
+                if best > alpha:
+                    alpha = best
+                    if alpha >= beta:
+                        break
+    elif not mover and not other:
+        return 0
+    elif other and count + RANK_VALUE[other[0]] <= MAX_COUNT:
+        # Go: the other player keeps playing on this count.
+        best = -_search(other, mover, count, played, not mover_last, -beta, -alpha, table, limit)
+    elif mover_last:
+        # Neither can play: the last card of the count scores 1, and the
+        # player who did not play it leads the next count.
+        best = 1 - _search(other, mover, 0, (), False, 1 - beta, 1 - alpha, table, limit)
+    else:
+        best = _search(mover, other, 0, (), False, alpha + 1, beta + 1, table, limit) - 1
+
+    if len(table) >= limit:
+        table.clear()
+    if best <= original_alpha:
+        table[key] = best * 4 + _UPPER
+    elif best >= beta:
+        table[key] = best * 4 + _LOWER
+    else:
+        table[key] = best * 4 + _EXACT
+    return best
+
+
+def play_value(first: Iterable[int], second: Iterable[int], table: dict[tuple, int] | None = None) -> int:
+    """
+    Net pegging for the player who leads with ranks `first` against ranks
+    `second`, both playing their best with both hands known.
+
+    Pass the same `table` to calls that should share solved positions.
+    """
+    if table is None:
+        table = {}
+    # No play can be worth more than this to either side.
+    bound = 100
+    return _search(tuple(sorted(first)), tuple(sorted(second)), 0, (), False, -bound, bound, table, table_size())
+
+
+def opponent_hands(dealt: Iterable[int]) -> list[tuple[tuple[int, ...], int]]:
+    """
+    Every rank multiset the opponent's 4 cards can form when we were dealt
+    ranks `dealt`, with the number of 4-card hands that produce it.
+    """
+    left = [4] * NUM_RANKS
+    for rank in dealt:
+        left[rank] -= 1
+    hands = []
+    for ranks in combinations_with_replacement(range(NUM_RANKS), 4):
+        weight = 1
+        for rank in set(ranks):
+            weight *= comb(left[rank], ranks.count(rank))
+        if weight:
+            hands.append((ranks, weight))
+    return hands
+
+
+def opponent_sample(dealt: Iterable[int], samples: int) -> list[tuple[int, ...]]:
+    """
+    `samples` opponent hands (rank multisets) for ranks `dealt`, drawn by
+    weight from `opponent_hands`. The same deal always gets the same sample.
+    """
+    dealt = tuple(sorted(dealt))
+    hands, weights = zip(*opponent_hands(dealt))
+    # Systematic sampling: evenly spaced points through the cumulative
+    # weights, from one seeded random offset. Hands are listed in rank
+    # order, so this spreads the sample over every kind of hand.
+    cumulative = list(accumulate(weights))
+    step = cumulative[-1] / samples
+    offset = random.Random(f"pegging:{dealt}|{samples}").random()
+    return [hands[bisect_right(cumulative, (i + offset) * step)] for i in range(samples)]
+
+
+@metrics.timed
+def keep_values(dealt: Iterable[int], *, leads: bool, samples: int = DEFAULT_SAMPLES) -> dict[tuple[int, ...], float]:
+    """
+    Expected net pegging of each keep of a deal.
+
+    `dealt` are the ranks of our 6 cards and `leads` is True when we play
+    first (the opponent dealt). Returns {sorted keep ranks: value}, averaged
+    over the same `opponent_sample` of `samples` hands for every keep.
+    """
+    dealt = tuple(sorted(dealt))
+    if len(dealt) != 6:
+        raise ValueError("keep_values expects the ranks of 6 cards")
+    key = f"{''.join(format(r, 'x') for r in dealt)}|{int(leads)}|{samples}"
+    values = cache.get("pegging", key, _decode_values)
+    if values is not None:
+        return values
+
+    sample = opponent_sample(dealt, samples)
+    values = {}
+    table: dict[tuple, int] = {}
+    for keep in sorted(set(combinations(dealt, 4))):
+        total = 0
+        for hand in sample:
+            total += play_value(keep, hand, table) if leads else -play_value(hand, keep, table)
+        values[keep] = total / samples
+    cache.put("pegging", key, values, _encode_values)
+    return values
+
+
+def _encode_values(values: dict[tuple[int, ...], float]) -> list:
+    return [[list(keep), value] for keep, value in values.items()]
+
+
+def _decode_values(rows: list) -> dict[tuple[int, ...], float]:
+    return {tuple(keep): value for keep, value in rows}
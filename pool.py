@@ -0,0 +1,65 @@
+"""
+Optional process pool for spreading gameplay work across CPU cores.
+
+The pool is off unless CRIBBDLE_POOL_WORKERS is set to a positive number.
+Each process (i.e. each gunicorn worker) starts its own pool the first time
+`get_executor()` is called and keeps it for its lifetime.
+
+Settings:
+    CRIBBDLE_POOL_WORKERS     number of pool processes (default 0 = off)
+    CRIBBDLE_POOL_CHUNK_SIZE  starters per task (default 12)
+"""
+
+from __future__ import annotations
+
+import atexit
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor
+
+
+DEFAULT_CHUNK_SIZE = 12
+
+_executor: ProcessPoolExecutor | None = None
+_executor_pid: int | None = None
+
+
+def worker_count() -> int:
+    """Configured number of pool processes; 0 disables the pool."""
+    return int(os.environ.get("CRIBBDLE_POOL_WORKERS", "0"))
+
+
+def chunk_size() -> int:
+    """Configured number of starters handed to each pool task."""
+    return int(os.environ.get("CRIBBDLE_POOL_CHUNK_SIZE", str(DEFAULT_CHUNK_SIZE)))
+
+
+def get_executor() -> Executor | None:
+    """
+    Return this process's pool, starting it on first use.
+
+    Returns None when the pool is disabled, which callers treat as "run
+    serially". A pool inherited across fork belongs to the parent and is
+    never reused.
+    """
+    global _executor, _executor_pid
+
+    workers = worker_count()
+    if workers <= 0:
+        return None
+    if _executor is None or _executor_pid != os.getpid():
+        _executor = ProcessPoolExecutor(max_workers=workers)
+        _executor_pid = os.getpid()
+    return _executor
+
+
+def shutdown() -> None:
+    """Stop this process's pool, if it started one."""
+    global _executor, _executor_pid
+
+    if _executor is not None and _executor_pid == os.getpid():
+        _executor.shutdown(wait=False, cancel_futures=True)
+    _executor = None
+    _executor_pid = None
+
+
+atexit.register(shutdown)
@@ -0,0 +1,126 @@
+"""
+Pool of pre-analyzed practice deals.
+
+A background thread in each process deals random hands, analyzes them with
+`evaluate_deal` (the analysis deal sessions make, see deal_sessions.py), and
+files them by difficulty. `draw()` then hands one out in O(1) and wakes the
+thread to replace it; /api/deal opens the deal's session with the analysis
+already done, so scoring it computes nothing.
+
+Difficulty is the expected-value gap between the best and second-best keep:
+a clear winner is easy, a near tie is hard. Keeps with the same ranks and the
+same value (suits that make no difference) count as one keep.
+
+Settings:
+    CRIBBDLE_PRACTICE_POOL_SIZE  deals kept per difficulty (default 20, 0 = off)
+"""
+
+from __future__ import annotations
+
+import os
+import random
+import threading
+import time
+import warnings
+from collections import deque
+
+from gameplay import CARD_CODES, RANK_ORDER, card_ids, evaluate_deal
+
+
+DIFFICULTIES = ("easy", "medium", "hard")
+DEFAULT_POOL_SIZE = 20
+
+# Gap in expected points between the best and second-best keep.
+EASY_GAP = 2.0
+HARD_GAP = 0.5
+
+# Seconds the filler pauses after a deal fails to analyze.
+FAILURE_PAUSE = 1.0
+
+_pools: dict[str, deque] = {difficulty: deque() for difficulty in DIFFICULTIES}
+_wake = threading.Condition()
+_filler_pid: int | None = None
+
+
+def pool_size() -> int:
+    """Configured number of deals kept per difficulty."""
+    return int(os.environ.get("CRIBBDLE_PRACTICE_POOL_SIZE", str(DEFAULT_POOL_SIZE)))
+
+
+def difficulty_of(gap: float) -> str:
+    """Difficulty for a best vs second-best expected-value gap."""
+    if gap >= EASY_GAP:
+        return "easy"
+    if gap < HARD_GAP:
+        return "hard"
+    return "medium"
+
+
+def analyze_deal(cards: list[str]) -> dict:
+    """
+    A pool entry for `cards`: {"cards", "analysis", "gap", "difficulty"}.
+
+    The analysis is `evaluate_deal` of the sorted cards, as a deal session
+    makes it; the gap is measured with my crib.
+    """
+    analysis = evaluate_deal(sorted(card_ids(cards)))
+    # Rank-equivalent keeps tie exactly (up to rounding) and are one choice.
+    distinct = {
+        (tuple(sorted(RANK_ORDER.index(card[0]) for card in keep["keep"])), round(keep["combined_value"], 9))
+        for keep in analysis["my_crib"]["keeps"]
+    }
+    values = sorted((value for _, value in distinct), reverse=True)
+    gap = values[0] - values[1] if len(values) > 1 else float("inf")
+    return {"cards": cards, "analysis": analysis, "gap": gap, "difficulty": difficulty_of(gap)}
+
+
+def draw(difficulty: str | None = None) -> dict | None:
+    """
+    Take a deal from the pool, or return None if none is ready.
+
+    With no difficulty, any pool that has a deal is used.
+    """
+    if difficulty is not None and difficulty not in _pools:
+        raise ValueError(f"Unknown difficulty {difficulty!r}; expected one of {', '.join(DIFFICULTIES)}")
+    candidates = [difficulty] if difficulty else [d for d in DIFFICULTIES if _pools[d]]
+    if not candidates:
+        return None
+    try:
+        entry = _pools[random.choice(candidates)].popleft()
+    except IndexError:
+        return None
+    with _wake:
+        _wake.notify()
+    return entry
+
+
+def _fill() -> None:
+    """Deal and analyze hands until every pool is full, then wait for draws."""
+    size = pool_size()
+    deck = list(CARD_CODES)
+    while True:
+        with _wake:
+            while all(len(pool) >= size for pool in _pools.values()):
+                _wake.wait()
+        cards = random.sample(deck, 6)
+        try:
+            entry = analyze_deal(cards)
+        except Exception as exc:
+            # One bad deal must not stop the refills for the life of the worker.
+            warnings.warn(f"Could not analyze practice deal {cards}: {exc!r}")
+            time.sleep(FAILURE_PAUSE)
+            continue
+        pool = _pools[entry["difficulty"]]
+        if len(pool) < size:
+            pool.append(entry)
+
+
+def start_filler() -> None:
+    """Start this process's filler thread, unless disabled or already running."""
+    global _filler_pid
+
+    if pool_size() <= 0 or _filler_pid == os.getpid():
+        return
+    # Deals inherited across fork are kept, but the parent's thread is not.
+    _filler_pid = os.getpid()
+    threading.Thread(target=_fill, name="cribbdle-practice", daemon=True).start()
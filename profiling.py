@@ -0,0 +1,188 @@
+"""
+Opt-in cProfile profiling of individual /api/ requests.
+
+Off unless CRIBBDLE_PROFILE_DIR is set when the app starts; then `install`
+adds request hooks to the blueprint, and otherwise it adds nothing, so a
+disabled profiler costs nothing per request. When on, a request is
+profiled if
+
+    - it sends the X-Cribbdle-Profile header with the value of
+      CRIBBDLE_PROFILE_TOKEN (only if a token is configured), or
+    - it is picked at random, with probability CRIBBDLE_PROFILE_SAMPLE_RATE.
+
+Each profile is written to the directory as <time>-<endpoint>-<hand>.prof
+(pstats format, e.g. `python -m pstats` or snakeviz), next to a .json file
+with the endpoint, hand, status and duration. Only the newest
+CRIBBDLE_PROFILE_KEEP profiles are kept.
+
+cProfile only sees the request's own thread, so crib analysis that would
+run as a background job runs inline while the request is profiled. Work
+sent to the process pool is not included. A process profiles one request
+at a time (a lock is held while a profile runs, since before Python 3.12
+cProfile lets profilers overlap and record each other's work); requests
+arriving meanwhile are served unprofiled.
+
+Settings:
+    CRIBBDLE_PROFILE_DIR          where profiles go (default unset = off)
+    CRIBBDLE_PROFILE_SAMPLE_RATE  share of /api/ requests profiled (default 0)
+    CRIBBDLE_PROFILE_TOKEN        X-Cribbdle-Profile value that forces a profile
+    CRIBBDLE_PROFILE_KEEP         profiles kept (default 200)
+"""
+
+from __future__ import annotations
+
+import cProfile
+import datetime
+import glob
+import hmac
+import json
+import os
+import random
+import re
+import threading
+import time
+import warnings
+
+from flask import Blueprint, Response, g, request
+
+
+DEFAULT_KEEP = 200
+HEADER = "X-Cribbdle-Profile"
+
+_CARD_CODE = re.compile(r"^[A2-9TJQK][CDHS]$")
+
+# Held by the request being profiled.
+_lock = threading.Lock()
+
+
+def profile_dir() -> str:
+    """Configured profile directory; empty means profiling is off."""
+    return os.environ.get("CRIBBDLE_PROFILE_DIR", "")
+
+
+def sample_rate() -> float:
+    """Configured share of /api/ requests to profile."""
+    return float(os.environ.get("CRIBBDLE_PROFILE_SAMPLE_RATE", "0"))
+
+
+def token() -> str:
+    """Configured header value that forces a profile; empty disables the header."""
+    return os.environ.get("CRIBBDLE_PROFILE_TOKEN", "")
+
+
+def keep() -> int:
+    """Configured number of profiles kept on disk."""
+    return int(os.environ.get("CRIBBDLE_PROFILE_KEEP", str(DEFAULT_KEEP)))
+
+
+def is_active() -> bool:
+    """Whether the current request is being profiled."""
+    return g.get("profiler") is not None
+
+
+def _reason() -> str | None:
+    """Why the current request should be profiled, or None if it should not."""
+    if not request.path.startswith("/api/"):
+        return None
+    expected = token()
+    sent = request.headers.get(HEADER)
+    if expected and sent is not None and hmac.compare_digest(sent, expected):
+        return "header"
+    rate = sample_rate()
+    if rate > 0 and random.random() < rate:
+        return "sample"
+    return None
+
+
+def _start() -> None:
+    reason = _reason()
+    if reason is None:
+        return
+    if not _lock.acquire(blocking=False):
+        # Another request on this process is already being profiled.
+        return
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError:
+        # Some other profiler is active (Python 3.12+ allows only one).
+        _lock.release()
+        return
+    g.profiler = profiler
+    g.profile_reason = reason
+    g.profile_start = time.perf_counter()
+
+
+def _cards(value) -> list[str]:
+    """Card codes from a request field, ignoring anything that is not one."""
+    if not isinstance(value, list):
+        return []
+    return [card for card in value if isinstance(card, str) and _CARD_CODE.match(card)]
+
+
+def _finish(response: Response) -> Response:
+    profiler = g.pop("profiler", None)
+    if profiler is None:
+        return response
+    profiler.disable()
+    _lock.release()
+    duration = time.perf_counter() - g.profile_start
+
+    data = request.get_json(silent=True) if request.is_json else None
+    data = data if isinstance(data, dict) else {}
+    hand = _cards(data.get("hand"))
+    six_cards = _cards(data.get("six_cards"))
+    endpoint = (request.endpoint or "unknown").rsplit(".", 1)[-1]
+    stamp = datetime.datetime.now(datetime.timezone.utc).strftime("%Y%m%dT%H%M%S.%fZ")
+    name = "-".join(part for part in (stamp, endpoint, "".join(hand or six_cards), str(os.getpid())) if part)
+
+    directory = profile_dir()
+    try:
+        os.makedirs(directory, exist_ok=True)
+        profiler.dump_stats(os.path.join(directory, f"{name}.prof"))
+        with open(os.path.join(directory, f"{name}.json"), "w") as f:
+            json.dump(
+                {
+                    "endpoint": request.endpoint,
+                    "method": request.method,
+                    "path": request.path,
+                    "hand": hand,
+                    "six_cards": six_cards,
+                    "status": response.status_code,
+                    "duration_ms": duration * 1000,
+                    "reason": g.profile_reason,
+                },
+                f,
+            )
+        _rotate(directory)
+    except OSError as exc:
+        warnings.warn(f"Could not write request profile to {directory!r}: {exc}")
+    return response
+
+
+def _abandon(exc: BaseException | None) -> None:
+    """Stop a profiler left running by a request that raised."""
+    profiler = g.pop("profiler", None)
+    if profiler is not None:
+        profiler.disable()
+        _lock.release()
+
+
+def _rotate(directory: str) -> None:
+    """Delete the oldest profiles beyond the configured number."""
+    profiles = sorted(glob.glob(os.path.join(directory, "*.prof")))
+    for path in profiles[: max(0, len(profiles) - keep())]:
+        for stale in (path, f"{path[: -len('.prof')]}.json"):
+            try:
+                os.remove(stale)
+            except FileNotFoundError:
+                pass
+
+
+def install(bp: Blueprint) -> None:
+    """Add the profiling hooks to `bp` if CRIBBDLE_PROFILE_DIR is set."""
+    if not profile_dir():
+        return
+    bp.before_request(_start)
+    bp.after_request(_finish)
+    bp.teardown_request(_abandon)
@@ -1,36 +1,94 @@
 from __future__ import annotations
 
+import hashlib
+import json
 import random
+import time
 from typing import List
 
-from flask import Blueprint, jsonify, render_template, request
-
-from gameplay import best_keep_from_six, crib_outcome_stats, get_scoring_breakdown, starter_outcome_stats
+from flask import Blueprint, Response, g, jsonify, render_template, request
+
+import daily
+import deal_sessions
+import discard_db
+import jobs
+import metrics
+import pool
+import practice
+import profiling
+from gameplay import (
+    CARD_CODES,
+    CARD_RANK,
+    CribStats,
+    analyze_hand,
+    best_keep_from_six,
+    breakdowns_by_starter,
+    card_codes,
+    card_ids,
+    crib_outcome_stats,
+    get_scoring_breakdown,
+    iter_crib_outcome_stats,
+    starter_outcome_stats,
+)
 
 
 bp = Blueprint("main", __name__)
+profiling.install(bp)
+
+# Precomputed optimal discards (see discard_db.py), or None if not built.
+_DISCARD_DB = discard_db.load()
+
+# Optional parts of an /api/analyze response.
+ANALYZE_FIELDS = ("distribution", "breakdown", "starter_breakdowns", "best", "crib")
+
+# Upper limits for sampled crib estimates requested by clients.
+MAX_CRIB_SAMPLES = 100_000
+MAX_CRIB_TIME_BUDGET_MS = 1000
+
 
+@bp.before_request
+def _start_metrics():
+    g.metrics_token = metrics.start_request()
+    g.request_start = time.perf_counter()
 
-RANKS = "A23456789TJQK"
-SUITS = "CDHS"
+
+@bp.after_request
+def _record_metrics(response: Response) -> Response:
+    """Record the request's latency and add its Server-Timing header."""
+    elapsed = time.perf_counter() - g.request_start
+    endpoint = request.endpoint or "unknown"
+    metrics.observe(metrics.REQUEST_DURATION, (("endpoint", endpoint),), elapsed)
+    metrics.increment(
+        metrics.REQUESTS,
+        (("endpoint", endpoint), ("method", request.method), ("status", str(response.status_code))),
+    )
+    if request.path.startswith("/api/"):
+        response.headers["Server-Timing"] = metrics.server_timing(elapsed)
+    return response
+
+
+@bp.teardown_request
+def _end_metrics(exc: BaseException | None) -> None:
+    token = g.pop("metrics_token", None)
+    if token is not None:
+        metrics.end_request(token)
 
 
 def _build_deck() -> List[str]:
-    return [f"{r}{s}" for r in RANKS for s in SUITS]
+    return list(CARD_CODES)
 
 
-def _normalize_hand_by_ranks(hand: List[str]) -> List[str]:
+def _normalize_hand_by_ranks(hand: List[int]) -> List[int]:
     """
-    Normalize a hand by extracting just the ranks, sorted.
+    Normalize a hand of card ids by extracting just the ranks, sorted.
     This allows comparison of equivalent hands regardless of suits.
     For example: ["5C", "5D", "6H", "7S"] and ["5H", "5S", "6C", "7D"]
-    both normalize to ["5", "5", "6", "7"] and are considered equivalent.
+    both normalize to the ranks of 5, 5, 6, 7 and are considered equivalent.
     """
-    ranks = [c.strip().upper()[0] for c in hand]
-    return sorted(ranks)
+    return sorted(CARD_RANK[c] for c in hand)
 
 
-def _hands_are_equivalent(hand1: List[str], hand2: List[str]) -> bool:
+def _hands_are_equivalent(hand1: List[int], hand2: List[int]) -> bool:
     """
     Check if two hands are equivalent (same ranks, regardless of suits).
     """
@@ -43,21 +101,127 @@ def index():
     return render_template("index.html")
 
 
+@bp.route("/metrics", methods=["GET"])
+def metrics_endpoint():
+    """Request, gameplay and cache metrics of this worker in Prometheus text format."""
+    return Response(metrics.render(), content_type="text/plain; version=0.0.4; charset=utf-8")
+
+
 @bp.route("/api/deal", methods=["GET"])
 def api_deal():
-    """Deal 6 random distinct cards from a fresh deck."""
+    """
+    Deal 6 random distinct cards for practice.
+
+    Deals come from the pre-analyzed practice pool. An optional
+    ?difficulty=easy|medium|hard picks the pool. When the pool is empty a
+    fresh deck is shuffled instead.
+
+    The response includes a "deal_id" (None if deal sessions are off): the
+    session holds the pool's analysis, or starts analyzing a fresh deal
+    right away, and scoring calls that send the id back reuse that analysis
+    (see deal_sessions.py).
+    """
+    difficulty = request.args.get("difficulty") or None
+    if difficulty is not None and difficulty not in practice.DIFFICULTIES:
+        return (
+            jsonify({"error": f"'difficulty' must be one of: {', '.join(practice.DIFFICULTIES)}."}),
+            400,
+        )
+
+    entry = practice.draw(difficulty)
+    if entry is not None:
+        deal_id = deal_sessions.start(entry["cards"], entry["analysis"])
+        return jsonify({"cards": entry["cards"], "difficulty": entry["difficulty"], "deal_id": deal_id})
+
     deck = _build_deck()
     random.shuffle(deck)
     cards = deck[:6]
-    return jsonify({"cards": cards})
+    return jsonify({"cards": cards, "difficulty": None, "deal_id": deal_sessions.start(cards)})
+
+
+def _daily_response(payload: dict):
+    """JSON for daily puzzle data, cacheable until the puzzle changes."""
+    response = jsonify(payload)
+    response.set_etag(hashlib.sha1(response.get_data()).hexdigest())
+    response.cache_control.public = True
+    response.cache_control.max_age = daily.seconds_until_next_puzzle()
+    return response.make_conditional(request)
+
+
+@bp.route("/api/daily", methods=["GET"])
+def api_daily():
+    """Today's daily puzzle deal: {"date": "YYYY-MM-DD", "cards": [...]}."""
+    puzzle = daily.precompute(daily.today())
+    return _daily_response({"date": puzzle["date"], "cards": puzzle["cards"]})
+
+
+@bp.route("/api/daily/analysis", methods=["GET"])
+def api_daily_analysis():
+    """
+    Today's daily puzzle with its precomputed analysis: best_keep_from_six
+    with the crib, under "my_crib" and "opponent_crib".
+    """
+    return _daily_response(daily.precompute(daily.today()))
+
+
+def _best_keep_summary(result: dict) -> dict:
+    """The /api/score best-keep fields of a best_keep_from_six result."""
+    return {
+        "best_keep": result["best_keep"],
+        "best_avg_total": result["best_stats"]["avg_total"],
+        "best_crib_avg": result["best_crib_stats"]["avg_score"],
+        "best_combined_value": result["combined_value"],
+    }
+
+
+def _in_deal_order(keep: List[str], six_cards: List[int]) -> List[str]:
+    """`keep` (card codes) reordered to follow `six_cards`, as computed keeps are."""
+    kept = set(card_ids(keep))
+    return card_codes(c for c in six_cards if c in kept)
+
+
+def _best_keep(six_cards: List[int], *, is_crib: bool, my_crib: bool, deal_id: str | None = None) -> dict:
+    """
+    Best keep of a deal with the crib counted, as used by /api/score.
+
+    The daily puzzle and the discard database have it precomputed, and a
+    practice deal's session (`deal_id`) may have it already analyzed; anything
+    else is computed with pruning, which skips full crib stats for keeps that
+    cannot be best. Returns best_keep (card codes), best_avg_total,
+    best_crib_avg and best_combined_value.
+    """
+    analysis_key = "my_crib" if my_crib else "opponent_crib"
+    if not is_crib:
+        puzzle = daily.load(daily.today())
+        if puzzle is not None and sorted(card_ids(puzzle["cards"])) == sorted(six_cards):
+            return _best_keep_summary(puzzle["analysis"][analysis_key])
+        session = deal_sessions.analysis(deal_id, six_cards)
+        if session is not None:
+            # Sessions analyze the sorted deal; list the keep in request order.
+            summary = _best_keep_summary(session[analysis_key])
+            summary["best_keep"] = _in_deal_order(summary["best_keep"], six_cards)
+            return summary
+        stored = _DISCARD_DB.lookup(six_cards) if _DISCARD_DB is not None else None
+        if stored is not None:
+            return {
+                "best_keep": card_codes(stored[analysis_key]["best_keep"]),
+                "best_avg_total": stored[analysis_key]["hand_avg"],
+                "best_crib_avg": stored[analysis_key]["crib_avg"],
+                "best_combined_value": stored[analysis_key]["combined_value"],
+            }
+
+    result = best_keep_from_six(six_cards, is_crib=is_crib, my_crib=my_crib, include_crib=True, prune=True)
+    return _best_keep_summary(result)
 
 
 @bp.route("/api/score", methods=["POST"])
 def api_score():
     """
     Score a chosen 4-card hand and report starter-outcome stats.
-    Also compares the selection to the optimal keep from the 6 cards.
-    This endpoint returns hand stats quickly, without crib stats.
+    Also compares the selection to the optimal keep from the 6 cards, counting
+    the crib (see `_best_keep`: precomputed where possible, otherwise a
+    pruned crib-aware search). Crib stats for the chosen discard are not
+    included; see /api/score/crib.
 
     Expects JSON like:
         {
@@ -66,6 +230,8 @@ def api_score():
           "is_crib": false,
           "my_crib": true  # true if it's your crib, false if opponent's
         }
+
+    An optional "deal_id" from /api/deal reuses that deal's analysis.
     """
     data = request.get_json(silent=True) or {}
     hand = data.get("hand") or []
@@ -94,15 +260,19 @@ def api_score():
         )
 
     try:
+        # Card codes are converted to ids once, here at the API boundary.
+        hand = card_ids(hand)
+        six_cards = card_ids(six_cards)
+
         # Get stats for the user's selected hand (fast)
         stats = starter_outcome_stats(hand, is_crib=is_crib)
         
-        # Find the best keep from the 6 cards (skip crib evaluation for speed)
-        best_result = best_keep_from_six(six_cards, is_crib=is_crib, my_crib=my_crib, include_crib=False)
-        best_keep = best_result["best_keep"]
+        # Find the best keep from the 6 cards, counting the crib.
+        best = _best_keep(six_cards, is_crib=is_crib, my_crib=my_crib, deal_id=data.get("deal_id"))
+        best_keep = best["best_keep"]
         
         # Check if hands are equivalent (same ranks, regardless of suits)
-        is_optimal = _hands_are_equivalent(hand, best_keep)
+        is_optimal = _hands_are_equivalent(hand, card_ids(best_keep))
         
         # Return hand stats immediately (without crib stats)
         response = {
@@ -111,20 +281,208 @@ def api_score():
             "max_total": stats["max_total"],
             "avg_total": stats["avg_total"],
             "avg_delta": stats["avg_delta"],
-            "hand_distribution": [
-                v["total"] for v in stats["by_starter"].values()
-            ],  # Distribution of 5-card scores across all starters
+            "hand_distribution": stats.totals.tolist(),  # Distribution of 5-card scores across all starters
             "is_optimal": is_optimal,
             "best_keep": best_keep,
-            "best_avg_total": best_result["best_stats"]["avg_total"],
-            "discard": [c for c in six_cards if c not in hand],
+            "best_avg_total": best["best_avg_total"],
+            "best_crib_avg": best["best_crib_avg"],
+            "best_combined_value": best["best_combined_value"],
+            "discard": card_codes(c for c in six_cards if c not in hand),
+        }
+
+        return jsonify(response)
+    except Exception as exc:  # pragma: no cover - defensive
+        return jsonify({"error": str(exc)}), 400
+
+
+def _compact(value: float) -> float:
+    """Round a float for compact JSON; the UI shows at most one decimal."""
+    return round(value, 4)
+
+
+@bp.route("/api/analyze", methods=["POST"])
+def api_analyze():
+    """
+    Hand stats, breakdown, optimal keep and crib stats in one request.
+
+    Expects JSON like:
+        {
+          "hand": ["5C", "5D", "6H", "7S"],
+          "six_cards": ["5C", "5D", "6H", "7S", "QC", "KD"],
+          "is_crib": false,
+          "my_crib": true,
+          "include": ["distribution", "breakdown", "best", "crib"]
+        }
+
+    Everything comes from one evaluation of the deal (see
+    `gameplay.analyze_hand`), so starters are the 46 cards not dealt. Only
+    "hand" is always returned:
+        {
+          "hand": {"base", "avg", "delta", "min", "max"},
+          "distribution": [hand total per starter],
+          "breakdown": get_scoring_breakdown of the 4 kept cards,
+          "starter_breakdowns": {starter: breakdown of the 5-card hand},
+          "best": {"keep", "hand_avg", "crib_avg", "combined", "is_optimal"},
+          "crib": {"avg", "min", "max", "distribution"}
+        }
+    Averages are rounded to 4 decimals. An optional "deal_id" from /api/deal
+    reuses that deal's analysis instead of evaluating it again.
+    """
+    data = request.get_json(silent=True) or {}
+    hand = data.get("hand") or []
+    six_cards = data.get("six_cards") or []
+    is_crib = bool(data.get("is_crib", False))
+    my_crib = bool(data.get("my_crib", True))
+    include = data.get("include") or []
+
+    if not isinstance(hand, list) or len(hand) != 4:
+        return (
+            jsonify(
+                {
+                    "error": "Request must include 'hand' as a list of 4 card codes."
+                }
+            ),
+            400,
+        )
+
+    if not isinstance(six_cards, list) or len(six_cards) != 6:
+        return (
+            jsonify(
+                {
+                    "error": "Request must include 'six_cards' as a list of 6 card codes."
+                }
+            ),
+            400,
+        )
+
+    if (
+        not isinstance(include, list)
+        or not all(isinstance(field, str) for field in include)
+        or not set(include) <= set(ANALYZE_FIELDS)
+    ):
+        return (
+            jsonify(
+                {
+                    "error": f"'include' must be a list drawn from: {', '.join(ANALYZE_FIELDS)}."
+                }
+            ),
+            400,
+        )
+
+    try:
+        hand = card_ids(hand)
+        six_cards = card_ids(six_cards)
+        include_crib = "best" in include or "crib" in include
+        analysis = None
+        if include_crib and not is_crib and len(set(hand)) == 4 and set(hand) <= set(six_cards):
+            session = deal_sessions.analysis(data.get("deal_id"), six_cards)
+            if session is not None:
+                analysis = {
+                    "stats": session["stats"][tuple(sorted(hand))],
+                    "crib_stats": session["crib_stats"][tuple(sorted(set(six_cards) - set(hand)))],
+                    "best": dict(session["my_crib" if my_crib else "opponent_crib"]),
+                }
+                analysis["best"]["best_keep"] = _in_deal_order(analysis["best"]["best_keep"], six_cards)
+        if analysis is None:
+            analysis = analyze_hand(
+                hand,
+                six_cards,
+                is_crib=is_crib,
+                my_crib=my_crib,
+                include_crib=include_crib,
+                executor=pool.get_executor(),
+                chunk_size=pool.chunk_size(),
+            )
+        stats = analysis["stats"]
+
+        response: dict = {
+            "hand": {
+                "base": stats["base_score"],
+                "avg": _compact(stats["avg_total"]),
+                "delta": _compact(stats["avg_delta"]),
+                "min": stats["min_total"],
+                "max": stats["max_total"],
+            },
         }
+        if "distribution" in include:
+            response["distribution"] = stats.totals.tolist()
+        if "breakdown" in include:
+            response["breakdown"] = get_scoring_breakdown(hand, is_crib=is_crib)
+        if "starter_breakdowns" in include:
+            undealt = [c for c in range(len(CARD_CODES)) if c not in six_cards]
+            response["starter_breakdowns"] = breakdowns_by_starter(hand, is_crib=is_crib, deck=undealt)
+        if "best" in include:
+            best = analysis["best"]
+            response["best"] = {
+                "keep": best["best_keep"],
+                "hand_avg": _compact(best["best_stats"]["avg_total"]),
+                "crib_avg": _compact(best["best_crib_stats"]["avg_score"]),
+                "combined": _compact(best["combined_value"]),
+                "is_optimal": _hands_are_equivalent(hand, card_ids(best["best_keep"])),
+            }
+        if "crib" in include:
+            crib_stats = analysis["crib_stats"]
+            response["crib"] = {
+                "avg": _compact(crib_stats["avg_score"]),
+                "min": crib_stats["min_score"],
+                "max": crib_stats["max_score"],
+                "distribution": [_compact(v) for v in crib_stats.starter_avgs],
+            }
 
         return jsonify(response)
     except Exception as exc:  # pragma: no cover - defensive
         return jsonify({"error": str(exc)}), 400
 
 
+def _crib_job_id(discard: List[int], six_cards: List[int]) -> str:
+    """Job id naming an exact crib analysis; identical requests share it."""
+    return "crib-" + bytes(sorted(discard) + sorted(six_cards)).hex()
+
+
+def _parse_crib_job_id(job_id: str) -> tuple[List[int], List[int]] | None:
+    """(discard, six_cards) encoded in a crib job id, or None if malformed."""
+    prefix, _, encoded = job_id.partition("-")
+    if prefix != "crib" or len(encoded) != 16:
+        return None
+    try:
+        ids = list(bytes.fromhex(encoded))
+    except ValueError:
+        return None
+    discard, six_cards = ids[:2], ids[2:]
+    if max(ids) >= len(CARD_CODES) or len(set(six_cards)) != 6 or not set(discard) <= set(six_cards):
+        return None
+    if discard[0] == discard[1] or _crib_job_id(discard, six_cards) != job_id:
+        return None
+    return discard, six_cards
+
+
+def _exact_crib_response(discard: List[int], six_cards: List[int]) -> dict:
+    """The /api/score/crib response body for exact crib stats."""
+    crib_stats = crib_outcome_stats(
+        discard, six_cards=six_cards, executor=pool.get_executor(), chunk_size=pool.chunk_size()
+    )
+    return _exact_crib_body(crib_stats)
+
+
+def _exact_crib_body(crib_stats: CribStats) -> dict:
+    """The /api/score/crib response body for exact `crib_stats`."""
+    return {
+        "crib_stats": {
+            "avg_score": crib_stats["avg_score"],
+            "min_score": crib_stats["min_score"],
+            "max_score": crib_stats["max_score"],
+            "distribution": crib_stats.starter_avgs.tolist(),
+            "exact": True,
+        },
+    }
+
+
+def _job_response(job: jobs.Job):
+    """Job status as JSON: 200 once finished, 202 while still working."""
+    info = job.to_dict()
+    return jsonify(info), 200 if info["status"] in ("done", "error") else 202
+
+
 @bp.route("/api/score/crib", methods=["POST"])
 def api_score_crib():
     """
@@ -136,10 +494,26 @@ def api_score_crib():
           "hand": ["5C", "5D", "6H", "7S"],
           "six_cards": ["5C", "5D", "6H", "7S", "QC", "KD"],
         }
+
+    Optional "samples" and/or "time_budget_ms" return a quick estimate from
+    random cribs instead, with "samples", "std_error", "ci_low" and "ci_high"
+    and an empty distribution. "exact" tells the two apart.
+
+    Identical exact requests in flight share one computation. Without
+    "async" that is all the job threads do: the request still waits for the
+    result and holds its (sync gunicorn) worker for the whole computation.
+    With "async": true the exact stats are computed in the background and
+    the response is a job (see /api/jobs/<job_id>) whose "result" is this
+    endpoint's usual body, so the worker is free while it runs. An optional
+    "deal_id" from /api/deal reuses that deal's analysis for the exact stats.
+    The page only asks this endpoint for sampled estimates; it gets exact
+    crib stats from /api/analyze.
     """
     data = request.get_json(silent=True) or {}
     hand = data.get("hand") or []
     six_cards = data.get("six_cards") or []
+    samples = data.get("samples")
+    time_budget_ms = data.get("time_budget_ms")
 
     if not isinstance(hand, list) or len(hand) != 4:
         return (
@@ -162,23 +536,159 @@ def api_score_crib():
         )
 
     try:
-        # Calculate crib stats for the discarded cards (slow)
+        hand = card_ids(hand)
+        six_cards = card_ids(six_cards)
+
         discard = [c for c in six_cards if c not in hand]
-        crib_stats = crib_outcome_stats(discard, six_cards=six_cards)
-        
+        sampled = samples is not None or time_budget_ms is not None
+        session = None if sampled else deal_sessions.analysis(data.get("deal_id"), six_cards)
+        if sampled:
+            # Quick estimate from random cribs
+            crib_stats = crib_outcome_stats(
+                discard,
+                six_cards=six_cards,
+                samples=min(int(samples), MAX_CRIB_SAMPLES) if samples is not None else None,
+                time_budget_ms=(
+                    min(float(time_budget_ms), MAX_CRIB_TIME_BUDGET_MS) if time_budget_ms is not None else None
+                ),
+            )
+        elif session is not None:
+            return jsonify(_exact_crib_body(session["crib_stats"][tuple(sorted(discard))]))
+        elif data.get("async"):
+            job_id = _crib_job_id(discard, six_cards)
+            return _job_response(jobs.submit(job_id, _exact_crib_response, discard, six_cards))
+        else:
+            # Calculate crib stats for the discarded cards (slow). This
+            # blocks the worker until done; jobs.run only dedups the work.
+            job_id = _crib_job_id(discard, six_cards)
+            if profiling.is_active():
+                # Keep the work on this thread, where the profiler can see it.
+                return jsonify(_exact_crib_response(discard, six_cards))
+            return jsonify(jobs.run(job_id, _exact_crib_response, discard, six_cards))
+
         response = {
             "crib_stats": {
                 "avg_score": crib_stats["avg_score"],
                 "min_score": crib_stats["min_score"],
                 "max_score": crib_stats["max_score"],
-                "distribution": list(crib_stats["by_starter"].values()),
+                "distribution": [],
+                "exact": False,
+                "samples": crib_stats["samples"],
+                "std_error": crib_stats["std_error"],
+                "ci_low": crib_stats["ci_low"],
+                "ci_high": crib_stats["ci_high"],
             },
         }
 
         return jsonify(response)
+    except jobs.JobQueueFull as exc:
+        return jsonify({"error": str(exc)}), 503, {"Retry-After": "1"}
+    except Exception as exc:  # pragma: no cover - defensive
+        return jsonify({"error": str(exc)}), 400
+
+
+@bp.route("/api/jobs/<job_id>", methods=["GET"])
+def api_job(job_id: str):
+    """
+    Poll a background job started by /api/score/crib with "async": true.
+
+    Returns {"job_id", "status"} with status "pending", "running", "done"
+    (plus "result") or "error" (plus "error"). Jobs live in the worker that
+    started them; another worker, or one whose copy has expired, restarts
+    the job from its id, which is quick once the result is cached.
+    """
+    job = jobs.get(job_id)
+    if job is None:
+        parsed = _parse_crib_job_id(job_id)
+        if parsed is None:
+            return jsonify({"error": f"Unknown job {job_id!r}."}), 404
+        try:
+            job = jobs.submit(job_id, _exact_crib_response, *parsed)
+        except jobs.JobQueueFull as exc:
+            return jsonify({"error": str(exc)}), 503, {"Retry-After": "1"}
+    return _job_response(job)
+
+
+def _sse_event(event: str, data: dict) -> str:
+    """Format one server-sent event."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+@bp.route("/api/score/crib/stream", methods=["POST"])
+def api_score_crib_stream():
+    """
+    Stream crib stats for discarded cards as server-sent events.
+
+    Takes the same JSON as /api/score/crib. Emits one "starter" event per
+    starter card with that starter's average and the running stats so far
+    (see `iter_crib_outcome_stats`), then a "done" event with the same
+    "crib_stats" /api/score/crib returns. If the client disconnects, the
+    server closes the stream and the remaining starters are never computed.
+    """
+    data = request.get_json(silent=True) or {}
+    hand = data.get("hand") or []
+    six_cards = data.get("six_cards") or []
+
+    if not isinstance(hand, list) or len(hand) != 4:
+        return (
+            jsonify(
+                {
+                    "error": "Request must include 'hand' as a list of 4 card codes."
+                }
+            ),
+            400,
+        )
+
+    if not isinstance(six_cards, list) or len(six_cards) != 6:
+        return (
+            jsonify(
+                {
+                    "error": "Request must include 'six_cards' as a list of 6 card codes."
+                }
+            ),
+            400,
+        )
+
+    try:
+        hand = card_ids(hand)
+        six_cards = card_ids(six_cards)
+        discard = [c for c in six_cards if c not in hand]
+        updates = iter_crib_outcome_stats(discard, six_cards=six_cards)
     except Exception as exc:  # pragma: no cover - defensive
         return jsonify({"error": str(exc)}), 400
 
+    def events():
+        distribution = []
+        update = None
+        try:
+            for update in updates:
+                distribution.append(update["starter_avg"])
+                yield _sse_event("starter", update)
+        except Exception as exc:  # pragma: no cover - defensive
+            yield _sse_event("error", {"error": str(exc)})
+            return
+        finally:
+            # Runs on client disconnect too, when the server closes us.
+            updates.close()
+        yield _sse_event(
+            "done",
+            {
+                "crib_stats": {
+                    "avg_score": update["avg_score"] if update else 0.0,
+                    "min_score": update["min_score"] if update else 0.0,
+                    "max_score": update["max_score"] if update else 0.0,
+                    "distribution": distribution,
+                    "exact": True,
+                },
+            },
+        )
+
+    return Response(
+        events(),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
 
 @bp.route("/api/score/breakdown", methods=["POST"])
 def api_score_breakdown():
@@ -206,7 +716,7 @@ def api_score_breakdown():
         )
     
     try:
-        breakdown = get_scoring_breakdown(hand, is_crib=is_crib)
+        breakdown = get_scoring_breakdown(card_ids(hand), is_crib=is_crib)
         return jsonify(breakdown)
     except Exception as exc:  # pragma: no cover - defensive
         return jsonify({"error": str(exc)}), 400
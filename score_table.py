@@ -0,0 +1,133 @@
+"""
+Precomputed score table for the suit-independent part of cribbage scoring.
+
+Fifteens, pairs and runs depend only on the ranks in a hand, so they can be
+looked up instead of recomputed. The table holds one byte per ordered rank
+tuple:
+
+    - 13**5 entries for 5-card hands (4 cards + starter)
+    - 13**4 entries for 4-card hands (no starter)
+
+The index of a rank tuple (r0, r1, ..., rn) is its base-13 value, so no
+sorting is needed at lookup time. Flush and knobs are cheap and still
+computed from the suits by the caller.
+
+Build the file once with:
+
+    python score_table.py build
+
+The file is memory-mapped read-only by `load()`, so every gunicorn worker
+shares the same pages through the OS page cache.
+"""
+
+from __future__ import annotations
+
+import argparse
+import mmap
+import os
+import warnings
+from itertools import combinations_with_replacement, permutations
+from typing import Sequence
+
+
+MAGIC = b"CRIBSCT1"
+NUM_RANKS = 13
+SIZE_5 = NUM_RANKS**5
+SIZE_4 = NUM_RANKS**4
+OFFSET_5 = len(MAGIC)
+OFFSET_4 = OFFSET_5 + SIZE_5
+FILE_SIZE = OFFSET_4 + SIZE_4
+
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "score_table.bin")
+
+
+def table_path() -> str:
+    """Path of the score table, overridable with CRIBBDLE_SCORE_TABLE."""
+    return os.environ.get("CRIBBDLE_SCORE_TABLE", DEFAULT_PATH)
+
+
+def table_index(ranks: Sequence[int]) -> int:
+    """
+    Byte offset of a 4- or 5-card rank tuple inside the table.
+
+    Ranks are indices into RANK_ORDER (0 = ace, 12 = king).
+    """
+    index = 0
+    for r in ranks:
+        index = index * NUM_RANKS + r
+    return index + (OFFSET_5 if len(ranks) == 5 else OFFSET_4)
+
+
+def build(path: str | None = None) -> str:
+    """
+    Compute every entry of the table and write it to `path`.
+
+    Each rank multiset is scored once and the result is copied to all of its
+    orderings. Returns the path written.
+    """
+    # Imported here so gameplay can load the table at import time.
+    from gameplay import _score_core
+
+    path = path or table_path()
+    data = bytearray(FILE_SIZE)
+    data[: len(MAGIC)] = MAGIC
+
+    for size in (5, 4):
+        for multiset in combinations_with_replacement(range(NUM_RANKS), size):
+            if size == 5 and multiset[0] == multiset[-1]:
+                # Five of a kind cannot be dealt.
+                continue
+            points = _score_core(multiset)
+            for ordering in set(permutations(multiset)):
+                data[table_index(ordering)] = points
+
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+    return path
+
+
+def load(path: str | None = None) -> mmap.mmap | None:
+    """
+    Memory-map the score table, or return None if it is unavailable.
+
+    A file that exists but is not a valid table is ignored with a warning, so
+    a stale table never stops the app (or a rebuild) from starting.
+    """
+    path = path or table_path()
+    try:
+        f = open(path, "rb")
+    except FileNotFoundError:
+        return None
+
+    with f:
+        if os.fstat(f.fileno()).st_size != FILE_SIZE:
+            warnings.warn(f"Ignoring score table {path!r}: wrong size; rebuild it with 'python score_table.py build'")
+            return None
+        table = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    if table[: len(MAGIC)] != MAGIC:
+        table.close()
+        warnings.warn(f"Ignoring score table {path!r}: unknown format; rebuild it with 'python score_table.py build'")
+        return None
+    return table
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Manage the precomputed cribbage score table.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build_parser = sub.add_parser("build", help="compute the table and write it to disk")
+    build_parser.add_argument("--output", default=None, help=f"output path (default: {DEFAULT_PATH})")
+
+    args = parser.parse_args(argv)
+    if args.command == "build":
+        written = build(args.output)
+        print(f"Wrote score table to {written}")
+
+
+if __name__ == "__main__":
+    main()
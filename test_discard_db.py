@@ -0,0 +1,62 @@
+"""
+Tests for the optimal-discard database against `best_keep_from_six`.
+
+A `--limit` build over the first few rank multisets is enough: every record
+is checked, in canonical suits and relabeled.
+"""
+
+from __future__ import annotations
+
+import pytest
+
+import discard_db
+from gameplay import best_keep_from_six, card_codes, relabel
+
+
+LIMIT = 20
+
+
+@pytest.fixture(autouse=True)
+def no_result_cache(monkeypatch):
+    monkeypatch.setenv("CRIBBDLE_CACHE_SIZE", "0")
+    monkeypatch.setenv("CRIBBDLE_CACHE_PATH", "")
+
+
+@pytest.fixture(scope="module")
+def db(tmp_path_factory):
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        # The build switches the on-disk result cache off for its process.
+        monkeypatch.setenv("CRIBBDLE_CACHE_SIZE", "0")
+        monkeypatch.setenv("CRIBBDLE_CACHE_PATH", "")
+        path = discard_db.build(str(tmp_path_factory.mktemp("discard_db") / "db.bin"), num_shards=2, limit=LIMIT)
+    return discard_db.load(path)
+
+
+def limited_deals():
+    return [deal for ranks in discard_db.rank_multisets(LIMIT) for deal in discard_db.canonical_deals(ranks)]
+
+
+def test_limited_build_covers_its_deals(db):
+    assert len(db) == len(limited_deals())
+
+
+@pytest.mark.parametrize("perm", [0, 7, 23])
+def test_records_match_best_keep_from_six(db, perm):
+    for canonical_deal in limited_deals():
+        deal = list(relabel(canonical_deal, perm))
+        stored = db.lookup(deal)
+        assert stored is not None, card_codes(deal)
+        for analysis_key, my_crib in (("my_crib", True), ("opponent_crib", False)):
+            computed = best_keep_from_six(deal, my_crib=my_crib, include_crib=True)
+            answer = stored[analysis_key]
+            assert answer["combined_value"] == computed["combined_value"]
+            assert answer["best_discard"] == [c for c in deal if c not in answer["best_keep"]]
+            keep = next(keep for keep in computed["keeps"] if keep["keep"] == card_codes(answer["best_keep"]))
+            # Tied keeps may be chosen differently, but are worth the same.
+            assert keep["combined_value"] == computed["combined_value"]
+            assert answer["hand_avg"] == keep["stats"]["avg_total"]
+            assert answer["crib_avg"] == keep["crib_stats"]["avg_score"]
+
+
+def test_lookup_misses_deals_outside_the_build(db):
+    assert db.lookup(["5C", "5D", "JH", "QS", "KD", "9C"]) is None
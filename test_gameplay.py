@@ -0,0 +1,88 @@
+"""
+Equivalence tests for the fast gameplay paths against brute-force baselines.
+
+Run with `python -m pytest -q`. The result cache is disabled so every call
+computes from scratch.
+"""
+
+from __future__ import annotations
+
+from itertools import combinations
+
+import pytest
+
+from gameplay import best_keep_from_six, card_ids, crib_outcome_stats, starter_outcome_stats
+
+
+# Fixed deals covering flushes (4- and 5-card), nobs, four of a kind and
+# runs with pairs.
+DEALS = [
+    ["AH", "3H", "5H", "7H", "9H", "JH"],  # six hearts: flushes and nobs for hearts
+    ["JC", "5C", "5D", "TC", "KC", "QC"],  # club flush with the jack
+    ["JH", "JD", "JC", "JS", "QH", "QD"],  # four jacks: nobs for every starter suit
+    ["5C", "5D", "5H", "JS", "5S", "TC"],  # four fives and the right jack
+    ["AC", "2C", "3C", "4C", "5C", "6C"],  # flush runs
+    ["3C", "3D", "4H", "4S", "5C", "5D"],  # double-double runs
+    ["6C", "7D", "8H", "9S", "9C", "8D"],  # run of four with pairs
+    ["2S", "8D", "KH", "4C", "9S", "QD"],  # nothing much
+]
+
+
+@pytest.fixture(autouse=True)
+def no_result_cache(monkeypatch):
+    monkeypatch.setenv("CRIBBDLE_CACHE_SIZE", "0")
+    monkeypatch.setenv("CRIBBDLE_CACHE_PATH", "")
+
+
+def assert_same_crib_stats(fast, slow):
+    assert fast["avg_score"] == pytest.approx(slow["avg_score"])
+    assert fast["min_score"] == slow["min_score"]
+    assert fast["max_score"] == slow["max_score"]
+    assert fast["by_starter"].keys() == slow["by_starter"].keys()
+    for starter, avg in slow["by_starter"].items():
+        assert fast["by_starter"][starter] == pytest.approx(avg), starter
+
+
+@pytest.mark.parametrize("deal", DEALS, ids=lambda deal: "".join(deal))
+def test_rank_class_crib_matches_brute_force(deal):
+    for discard in list(combinations(deal, 2))[::3]:
+        slow = crib_outcome_stats(discard, six_cards=deal, engine="python")
+        assert_same_crib_stats(crib_outcome_stats(discard, six_cards=deal), slow)
+        assert_same_crib_stats(crib_outcome_stats(discard, six_cards=deal, engine="numpy"), slow)
+
+
+def test_rank_class_crib_matches_brute_force_without_dealt_cards():
+    for discard in (["JH", "5H"], ["5C", "5D"], ["JS", "QS"]):
+        slow = crib_outcome_stats(discard, engine="python")
+        assert_same_crib_stats(crib_outcome_stats(discard), slow)
+
+
+def brute_force_keep_values(deal, my_crib):
+    """{keep codes: combined value}, scored card by card."""
+    undealt = [c for c in range(52) if c not in card_ids(deal)]
+    values = {}
+    for keep in combinations(deal, 4):
+        discard = [c for c in deal if c not in keep]
+        stats = starter_outcome_stats(keep, deck=undealt, engine="python")
+        crib = crib_outcome_stats(discard, six_cards=deal, engine="python")
+        combined = stats["avg_total"] + (crib["avg_score"] if my_crib else -crib["avg_score"])
+        values[keep] = combined
+    return values
+
+
+@pytest.mark.parametrize("my_crib", [True, False])
+@pytest.mark.parametrize("deal", DEALS, ids=lambda deal: "".join(deal))
+def test_best_keep_matches_brute_force(deal, my_crib):
+    values = brute_force_keep_values(deal, my_crib)
+    best_value = max(values.values())
+
+    full = best_keep_from_six(deal, my_crib=my_crib)
+    for keep in full["keeps"]:
+        assert keep["combined_value"] == pytest.approx(values[tuple(keep["keep"])])
+
+    pruned = best_keep_from_six(deal, my_crib=my_crib, prune=True)
+    assert pruned["combined_value"] == pytest.approx(best_value)
+    assert values[tuple(pruned["best_keep"])] == pytest.approx(best_value)
+    assert pruned["best_keep"] == full["best_keep"]
+    assert pruned["best_stats"].to_dict() == full["best_stats"].to_dict()
+    assert_same_crib_stats(pruned["best_crib_stats"], full["best_crib_stats"])
@@ -0,0 +1,117 @@
+"""
+Tests for the pegging search against a brute-force playout of every line.
+
+The baseline follows every card of both hands (not one per rank), applies
+go, the last card and 31 resets from the rules directly, and keeps no table.
+"""
+
+from __future__ import annotations
+
+import random
+
+import pytest
+
+import pegging
+from pegging import MAX_COUNT, RANK_VALUE, play_points
+
+
+@pytest.fixture(autouse=True)
+def no_result_cache(monkeypatch):
+    monkeypatch.setenv("CRIBBDLE_CACHE_SIZE", "0")
+    monkeypatch.setenv("CRIBBDLE_CACHE_PATH", "")
+
+
+def brute_force_net(hands, turn=0, count=0, played=(), last=None):
+    """Player 0's points minus player 1's from a position, both playing their best."""
+    if not hands[0] and not hands[1]:
+        return 0
+    sign = 1 if turn == 0 else -1
+    values = []
+    for i, rank in enumerate(hands[turn]):
+        new_count = count + RANK_VALUE[rank]
+        if new_count > MAX_COUNT:
+            continue
+        now_played = played + (rank,)
+        points = play_points(now_played, new_count)
+        rest = hands[turn][:i] + hands[turn][i + 1 :]
+        after = (rest, hands[1]) if turn == 0 else (hands[0], rest)
+        if new_count == MAX_COUNT:
+            value = sign * points + brute_force_net(after, 1 - turn)
+        elif not after[0] and not after[1]:
+            value = sign * (points + 1)
+        else:
+            value = sign * points + brute_force_net(after, 1 - turn, new_count, now_played, turn)
+        values.append(value)
+    if values:
+        return max(values) if turn == 0 else min(values)
+    if any(count + RANK_VALUE[rank] <= MAX_COUNT for rank in hands[1 - turn]):
+        # Go: the other player plays on.
+        return brute_force_net(hands, 1 - turn, count, played, last)
+    # Nobody can play: 1 for the last card, and the other player leads.
+    return (1 if last == 0 else -1) + brute_force_net(hands, 1 - last)
+
+
+def random_hands(rng, sizes):
+    deck = [rank for rank in range(pegging.NUM_RANKS) for _ in range(4)]
+    cards = rng.sample(deck, sum(sizes))
+    return tuple(cards[: sizes[0]]), tuple(cards[sizes[0] :])
+
+
+@pytest.mark.parametrize(
+    "first, second",
+    [
+        ((12, 11, 10, 9), (12, 11, 10, 0)),  # 10s to 30, go, and 31 with the ace
+        ((9, 9, 9, 4), (4, 0, 4, 12)),  # 10, 10, 10, 1 makes 31
+        ((12, 12, 12, 12), (11, 11, 11, 11)),  # a go on every count
+        ((4, 4, 4), (4,)),  # four fives
+        ((2, 3, 4, 5), (1, 6, 0, 7)),  # runs in both hands
+        ((7, 6), (5, 7)),  # 8, 7 for fifteen
+        ((12,), ()),  # last card alone
+    ],
+)
+def test_play_value_matches_brute_force(first, second):
+    expected = brute_force_net((tuple(sorted(first)), tuple(sorted(second))))
+    assert pegging.play_value(first, second) == expected
+
+
+def test_play_value_matches_brute_force_on_random_hands():
+    rng = random.Random(3)
+    for sizes in [(1, 1), (2, 1), (2, 2), (3, 2), (3, 3), (4, 3), (4, 4)] * 40:
+        first, second = random_hands(rng, sizes)
+        assert pegging.play_value(first, second) == brute_force_net((first, second)), (first, second)
+
+
+def test_shared_table_gives_the_same_values():
+    rng = random.Random(4)
+    table = {}
+    for _ in range(40):
+        first, second = random_hands(rng, (4, 4))
+        assert pegging.play_value(first, second, table) == pegging.play_value(first, second)
+
+
+def test_small_table_gives_the_same_values(monkeypatch):
+    monkeypatch.setenv("CRIBBDLE_PEGGING_TABLE_SIZE", "8")
+    first, second = (2, 3, 4, 9), (4, 5, 10, 12)
+    assert pegging.play_value(first, second) == brute_force_net((first, second))
+
+
+@pytest.mark.parametrize("leads", [True, False])
+@pytest.mark.parametrize("dealt", [(4, 4, 10, 11, 3, 5), (0, 1, 2, 12, 12, 6)])
+def test_keep_values_average_brute_force_over_the_sample(dealt, leads):
+    samples = 8
+    sample = pegging.opponent_sample(dealt, samples)
+    values = pegging.keep_values(dealt, leads=leads, samples=samples)
+    assert len(values) == len({tuple(sorted(keep)) for keep in values})
+    for keep, value in values.items():
+        hands = [(keep, hand) if leads else (hand, keep) for hand in sample]
+        nets = [brute_force_net(pair) for pair in hands]
+        expected = sum(nets if leads else [-net for net in nets]) / samples
+        assert value == pytest.approx(expected), keep
+
+
+def test_opponent_sample_only_holds_cards_left():
+    dealt = (4, 4, 4, 11, 11, 0)
+    for hand in pegging.opponent_sample(dealt, 64):
+        assert len(hand) == 4
+        for rank in set(hand):
+            assert hand.count(rank) + dealt.count(rank) <= 4